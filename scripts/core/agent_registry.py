@@ -109,7 +109,8 @@ class AgentRegistry:
     def __init__(
         self,
         project_root: Optional[Path] = None,
-        config_file: Optional[Path] = None
+        config_file: Optional[Path] = None,
+        probe: bool = True
     ):
         """
         Initialize the agent registry.
@@ -117,6 +118,8 @@ class AgentRegistry:
         Args:
             project_root: Root directory of the project
             config_file: Path to agents configuration file
+            probe: Detect all built-in agents now; when False, agents are
+                probed on first use (see get_recommended_agent_fast)
         """
         self.project_root = Path(project_root or Path.cwd()).resolve()
         self.config_file = config_file or self.project_root / "ai-context" / "config" / "agents.yaml"
@@ -124,9 +127,11 @@ class AgentRegistry:
         self._adapters: Dict[str, Type[BaseAdapter]] = {}
         self._agent_info: Dict[str, AgentInfo] = {}
         self._config: Dict[str, Any] = {}
+        self._probed = False
         
         self._load_config()
-        self._register_builtin_agents()
+        if probe:
+            self._register_builtin_agents()
     
     def _load_config(self) -> None:
         """Load configuration from file."""
@@ -167,6 +172,16 @@ class AgentRegistry:
         """Register all built-in agents."""
         for agent_id, agent_def in self.BUILTIN_AGENTS.items():
             self._register_agent(agent_id, agent_def)
+        self._probed = True
+    
+    def _ensure_probed(self) -> None:
+        """Probe the built-in agents a lazy registry has not probed yet."""
+        if self._probed:
+            return
+        for agent_id, agent_def in self.BUILTIN_AGENTS.items():
+            if agent_id not in self._agent_info:
+                self._register_agent(agent_id, agent_def)
+        self._probed = True
     
     def _register_agent(self, agent_id: str, agent_def: Dict[str, Any]) -> None:
         """
@@ -261,6 +276,7 @@ class AgentRegistry:
         Returns:
             AgentInfo or None if not found
         """
+        self._ensure_probed()
         return self._agent_info.get(agent_id)
     
     def get_all_agents(self) -> List[AgentInfo]:
@@ -270,6 +286,7 @@ class AgentRegistry:
         Returns:
             List of AgentInfo objects
         """
+        self._ensure_probed()
         return list(self._agent_info.values())
     
     def get_available_agents(self) -> List[AgentInfo]:
@@ -279,6 +296,7 @@ class AgentRegistry:
         Returns:
             List of available AgentInfo objects, sorted by priority
         """
+        self._ensure_probed()
         available = [
             info for info in self._agent_info.values()
             if info.available and info.api_key_configured
@@ -300,6 +318,7 @@ class AgentRegistry:
         Returns:
             Instantiated adapter or None if not available
         """
+        self._ensure_probed()
         adapter_class = self._adapters.get(agent_id)
         if not adapter_class:
             return None
@@ -340,6 +359,35 @@ class AgentRegistry:
         # Return highest priority
         return available[0]
     
+    def get_recommended_agent_fast(self) -> Optional[AgentInfo]:
+        """
+        Get the highest-priority available agent, probing lazily.
+        
+        On a registry created with ``probe=False``, built-in agents are
+        probed one at a time in priority order and the search stops at the
+        first available, configured agent. Otherwise this is the same as
+        ``get_recommended_agent()``.
+        
+        Returns:
+            Recommended AgentInfo or None if no agent is available
+        """
+        if self._probed:
+            return self.get_recommended_agent()
+        
+        # Stable sort, so equal priorities keep the get_recommended_agent order
+        by_priority = sorted(
+            self.BUILTIN_AGENTS.items(),
+            key=lambda item: item[1].get("priority", 0),
+            reverse=True,
+        )
+        for agent_id, agent_def in by_priority:
+            if agent_id not in self._agent_info:
+                self._register_agent(agent_id, agent_def)
+            info = self._agent_info[agent_id]
+            if info.available and info.api_key_configured:
+                return info
+        return None
+    
     def refresh(self) -> None:
         """Refresh agent availability and versions."""
         self._adapters.clear()
@@ -354,6 +402,7 @@ class AgentRegistry:
             agent_id: Agent to boost
             priority_boost: Amount to boost priority
         """
+        self._ensure_probed()
         if agent_id in self._agent_info:
             self._agent_info[agent_id].priority += priority_boost
             
@@ -11,15 +11,17 @@ Detects:
 
 from __future__ import annotations
 
+import hashlib
 import json
 import os
 import platform
 import re
 import shutil
 import subprocess
+import time
 from dataclasses import dataclass, field, asdict
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, List, Literal, NamedTuple, Optional, Any, Tuple
 from enum import Enum
 
 
@@ -61,6 +63,16 @@ class Framework(Enum):
     UNKNOWN = "unknown"
 
 
+class _AgentDef(NamedTuple):
+    """Static definition of a detectable AI agent."""
+    name: str
+    cli_command: str
+    api_key_env_var: Optional[str]
+    version_flag: str = "--version"
+    subcommand: Optional[str] = None
+    config_path: Optional[str] = None
+
+
 @dataclass
 class ToolInfo:
     """Information about a detected tool."""
@@ -144,6 +156,16 @@ class EnvironmentInfo:
         data["package_managers"] = [pm.to_dict() for pm in self.package_managers]
         data["ai_agents"] = [agent.to_dict() for agent in self.ai_agents]
         return data
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "EnvironmentInfo":
+        data = dict(data)
+        for key in ("python", "node", "java", "go", "rust", "git", "docker"):
+            if data.get(key) is not None:
+                data[key] = ToolInfo(**data[key])
+        data["package_managers"] = [ToolInfo(**pm) for pm in data.get("package_managers", [])]
+        data["ai_agents"] = [AIAgentInfo(**agent) for agent in data.get("ai_agents", [])]
+        return cls(**data)
 
 
 class EnvDetector:
@@ -157,57 +179,104 @@ class EnvDetector:
     """
     
     # AI Agent definitions
-    AI_AGENTS = [
-        {
-            "name": "Aider",
-            "cli_command": "aider",
-            "api_key_env_var": "OPENAI_API_KEY",
-            "version_flag": "--version",
-        },
-        {
-            "name": "Claude CLI",
-            "cli_command": "claude",
-            "api_key_env_var": "ANTHROPIC_API_KEY",
-            "version_flag": "--version",
-        },
-        {
-            "name": "GitHub Copilot CLI",
-            "cli_command": "gh",
-            "subcommand": "copilot",
-            "api_key_env_var": "GITHUB_TOKEN",
-            "version_flag": "--version",
-        },
-        {
-            "name": "OpenAI CLI",
-            "cli_command": "openai",
-            "api_key_env_var": "OPENAI_API_KEY",
-            "version_flag": "--version",
-        },
-        {
-            "name": "Google Cloud CLI",
-            "cli_command": "gcloud",
-            "api_key_env_var": "GOOGLE_APPLICATION_CREDENTIALS",
-            "version_flag": "--version",
-        },
-        {
-            "name": "Ollama",
-            "cli_command": "ollama",
-            "api_key_env_var": None,  # Local model, no API key
-            "version_flag": "--version",
-        },
-        {
-            "name": "Continue.dev",
-            "cli_command": "continue",
-            "api_key_env_var": None,
-            "version_flag": "--version",
-            "config_path": "~/.continue/config.json",
-        },
-        {
-            "name": "Cursor",
-            "cli_command": "cursor",
-            "api_key_env_var": None,
-            "version_flag": "--version",
-        },
+    AI_AGENTS = (
+        _AgentDef(
+            name="Aider",
+            cli_command="aider",
+            api_key_env_var="OPENAI_API_KEY",
+        ),
+        _AgentDef(
+            name="Claude CLI",
+            cli_command="claude",
+            api_key_env_var="ANTHROPIC_API_KEY",
+        ),
+        _AgentDef(
+            name="GitHub Copilot CLI",
+            cli_command="gh",
+            subcommand="copilot",
+            api_key_env_var="GITHUB_TOKEN",
+        ),
+        _AgentDef(
+            name="OpenAI CLI",
+            cli_command="openai",
+            api_key_env_var="OPENAI_API_KEY",
+        ),
+        _AgentDef(
+            name="Google Cloud CLI",
+            cli_command="gcloud",
+            api_key_env_var="GOOGLE_APPLICATION_CREDENTIALS",
+        ),
+        _AgentDef(
+            name="Ollama",
+            cli_command="ollama",
+            api_key_env_var=None,  # Local model, no API key
+        ),
+        _AgentDef(
+            name="Continue.dev",
+            cli_command="continue",
+            api_key_env_var=None,
+            config_path="~/.continue/config.json",
+        ),
+        _AgentDef(
+            name="Cursor",
+            cli_command="cursor",
+            api_key_env_var=None,
+        ),
+    )
+    
+    # Package managers as (display name, command), grouped by ecosystem
+    PACKAGE_MANAGERS = (
+        # Python
+        ("pip", "pip"),
+        ("pip3", "pip3"),
+        ("poetry", "poetry"),
+        ("uv", "uv"),
+        ("pipenv", "pipenv"),
+        ("conda", "conda"),
+        # Node.js
+        ("npm", "npm"),
+        ("yarn", "yarn"),
+        ("pnpm", "pnpm"),
+        ("bun", "bun"),
+        # Java
+        ("mvn", "mvn"),
+        ("gradle", "gradle"),
+        # Rust
+        ("cargo", "cargo"),
+        # Go
+        ("go mod", "go"),
+    )
+    
+    # Disk cache for detect_all results
+    CACHE_DIR_NAME = "ai-context-toolkit"
+    CACHE_TTL_SECONDS = 24 * 60 * 60
+    CACHE_VERSION = 1
+    
+    # Project files whose changes invalidate the cache
+    PROJECT_MARKER_FILES = [
+        "package.json",
+        "build.gradle",
+        "build.gradle.kts",
+        "pom.xml",
+        "requirements.txt",
+        "pyproject.toml",
+        "go.mod",
+        "Cargo.toml",
+        ".venv",
+        "venv",
+        "env",
+    ]
+    
+    # Environment variables that influence detection results
+    CACHE_ENV_VARS = [
+        "PATH",
+        "SHELL",
+        "COMSPEC",
+        "VIRTUAL_ENV",
+        "CONDA_DEFAULT_ENV",
+        "JAVA_HOME",
+        "GOPATH",
+        "GOROOT",
     ]
     
     def __init__(self, project_root: Optional[Path] = None):
@@ -218,6 +287,68 @@ class EnvDetector:
             project_root: Root directory of the project. Defaults to current directory.
         """
         self.project_root = Path(project_root or Path.cwd()).resolve()
+        self._resolved_tools: Dict[str, Optional[str]] = {}
+    
+    def _which(self, command: str) -> Optional[str]:
+        """Resolve a command on PATH, remembering the result."""
+        if command not in self._resolved_tools:
+            self._resolved_tools[command] = shutil.which(command)
+        return self._resolved_tools[command]
+    
+    def _cache_dir(self) -> Path:
+        """Get the user-level cache directory."""
+        base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+        return Path(base) / self.CACHE_DIR_NAME
+    
+    def _root_entries_mtime_tuple(self) -> Tuple[Tuple[str, int], ...]:
+        """Get (name, mtime) pairs for the project marker files that exist."""
+        entries = []
+        for name in self.PROJECT_MARKER_FILES:
+            try:
+                entries.append((name, (self.project_root / name).stat().st_mtime_ns))
+            except OSError:
+                continue
+        return tuple(entries)
+    
+    def _cache_key(self) -> str:
+        """Compute the cache key for the current project and environment."""
+        api_key_vars = sorted({
+            agent_def.api_key_env_var
+            for agent_def in self.AI_AGENTS
+            if agent_def.api_key_env_var
+        })
+        key_data = json.dumps([
+            self.CACHE_VERSION,
+            str(self.project_root),
+            [os.environ.get(var, "") for var in self.CACHE_ENV_VARS],
+            # Only presence matters; never hash secret values
+            [bool(os.environ.get(var)) for var in api_key_vars],
+            self._root_entries_mtime_tuple(),
+        ])
+        return hashlib.sha256(key_data.encode("utf-8")).hexdigest()[:16]
+    
+    def _cache_path(self) -> Path:
+        """Get the cache file path for the current key."""
+        return self._cache_dir() / f"env.{self._cache_key()}.json"
+    
+    def _load_cached(self, cache_path: Path) -> Optional[EnvironmentInfo]:
+        """Load cached detection results, or None if missing or stale."""
+        try:
+            if time.time() - cache_path.stat().st_mtime > self.CACHE_TTL_SECONDS:
+                return None
+            return EnvironmentInfo.from_dict(json.loads(cache_path.read_text(encoding="utf-8")))
+        except (OSError, json.JSONDecodeError, TypeError, KeyError):
+            return None
+    
+    def _save_cached(self, cache_path: Path, info: EnvironmentInfo) -> None:
+        """Write detection results to the cache (best effort)."""
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps(info.to_dict(), ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            pass
     
     def _run_command(
         self,
@@ -266,7 +397,7 @@ class EnvDetector:
     
     def detect_python(self) -> Optional[ToolInfo]:
         """Detect Python installation."""
-        python_cmd = shutil.which("python3") or shutil.which("python")
+        python_cmd = self._which("python3") or self._which("python")
         
         if not python_cmd:
             return ToolInfo(name="Python", available=False)
@@ -280,14 +411,14 @@ class EnvDetector:
             version=version,
             path=python_cmd,
             details={
-                "pip": shutil.which("pip3") or shutil.which("pip"),
+                "pip": self._which("pip3") or self._which("pip"),
                 "venv": self._detect_virtual_env(),
             }
         )
     
     def detect_node(self) -> Optional[ToolInfo]:
         """Detect Node.js installation."""
-        node_cmd = shutil.which("node")
+        node_cmd = self._which("node")
         
         if not node_cmd:
             return ToolInfo(name="Node.js", available=False)
@@ -296,10 +427,10 @@ class EnvDetector:
         version = self._extract_version(stdout) if success else None
         
         # Detect npm/yarn/pnpm
-        npm = shutil.which("npm")
-        yarn = shutil.which("yarn")
-        pnpm = shutil.which("pnpm")
-        bun = shutil.which("bun")
+        npm = self._which("npm")
+        yarn = self._which("yarn")
+        pnpm = self._which("pnpm")
+        bun = self._which("bun")
         
         return ToolInfo(
             name="Node.js",
@@ -316,7 +447,7 @@ class EnvDetector:
     
     def detect_java(self) -> Optional[ToolInfo]:
         """Detect Java installation."""
-        java_cmd = shutil.which("java")
+        java_cmd = self._which("java")
         
         if not java_cmd:
             return ToolInfo(name="Java", available=False)
@@ -331,15 +462,15 @@ class EnvDetector:
             version=version,
             path=java_cmd,
             details={
-                "maven": shutil.which("mvn"),
-                "gradle": shutil.which("gradle"),
+                "maven": self._which("mvn"),
+                "gradle": self._which("gradle"),
                 "java_home": os.environ.get("JAVA_HOME"),
             }
         )
     
     def detect_go(self) -> Optional[ToolInfo]:
         """Detect Go installation."""
-        go_cmd = shutil.which("go")
+        go_cmd = self._which("go")
         
         if not go_cmd:
             return ToolInfo(name="Go", available=False)
@@ -360,7 +491,7 @@ class EnvDetector:
     
     def detect_rust(self) -> Optional[ToolInfo]:
         """Detect Rust installation."""
-        rustc_cmd = shutil.which("rustc")
+        rustc_cmd = self._which("rustc")
         
         if not rustc_cmd:
             return ToolInfo(name="Rust", available=False)
@@ -374,13 +505,13 @@ class EnvDetector:
             version=version,
             path=rustc_cmd,
             details={
-                "cargo": shutil.which("cargo"),
+                "cargo": self._which("cargo"),
             }
         )
     
     def detect_git(self) -> Optional[ToolInfo]:
         """Detect Git installation and repository status."""
-        git_cmd = shutil.which("git")
+        git_cmd = self._which("git")
         
         if not git_cmd:
             return ToolInfo(name="Git", available=False)
@@ -417,7 +548,7 @@ class EnvDetector:
     
     def detect_docker(self) -> Optional[ToolInfo]:
         """Detect Docker installation."""
-        docker_cmd = shutil.which("docker")
+        docker_cmd = self._which("docker")
         
         if not docker_cmd:
             return ToolInfo(name="Docker", available=False)
@@ -435,7 +566,7 @@ class EnvDetector:
             path=docker_cmd,
             details={
                 "daemon_running": daemon_running,
-                "compose": shutil.which("docker-compose") or shutil.which("docker compose"),
+                "compose": self._which("docker-compose") or self._which("docker compose"),
             }
         )
     
@@ -460,73 +591,70 @@ class EnvDetector:
         return None
     
     def detect_package_managers(self) -> List[ToolInfo]:
-        """Detect available package managers."""
-        managers = []
-        
-        # Python
-        for pm in ["pip", "pip3", "poetry", "uv", "pipenv", "conda"]:
-            cmd = shutil.which(pm)
-            if cmd:
-                managers.append(ToolInfo(name=pm, available=True, path=cmd))
+        """
+        Detect available package managers.
         
-        # Node.js
-        for pm in ["npm", "yarn", "pnpm", "bun"]:
-            cmd = shutil.which(pm)
-            if cmd:
-                managers.append(ToolInfo(name=pm, available=True, path=cmd))
+        Reuses paths already resolved by the language detectors, so calling
+        this after detect_python/detect_node/... costs no extra PATH lookups.
+        """
+        managers = []
         
-        # Java
-        for pm in ["mvn", "gradle"]:
-            cmd = shutil.which(pm)
+        for name, command in self.PACKAGE_MANAGERS:
+            cmd = self._which(command)
             if cmd:
-                managers.append(ToolInfo(name=pm, available=True, path=cmd))
-        
-        # Rust
-        cargo = shutil.which("cargo")
-        if cargo:
-            managers.append(ToolInfo(name="cargo", available=True, path=cargo))
-        
-        # Go
-        go = shutil.which("go")
-        if go:
-            managers.append(ToolInfo(name="go mod", available=True, path=go))
+                managers.append(ToolInfo(name=name, available=True, path=cmd))
         
         return managers
     
-    def detect_ai_agents(self) -> List[AIAgentInfo]:
-        """Detect available AI agents."""
+    def detect_ai_agents(
+        self,
+        version_probe_policy: Literal["always", "if_configured", "never"] = "if_configured"
+    ) -> List[AIAgentInfo]:
+        """
+        Detect available AI agents.
+        
+        Args:
+            version_probe_policy: When to spawn ``<cli> --version``. With
+                "if_configured", agents missing their API key are not probed.
+        """
         agents = []
         
         for agent_def in self.AI_AGENTS:
-            cli_cmd = shutil.which(agent_def["cli_command"])
+            cli_cmd = self._which(agent_def.cli_command)
             
             agent = AIAgentInfo(
-                name=agent_def["name"],
-                cli_command=agent_def["cli_command"],
+                name=agent_def.name,
+                cli_command=agent_def.cli_command,
                 available=cli_cmd is not None,
             )
             
-            if cli_cmd:
+            # Check API key
+            if agent_def.api_key_env_var:
+                agent.api_key_env_var = agent_def.api_key_env_var
+                agent.api_key_configured = bool(os.environ.get(agent_def.api_key_env_var))
+            
+            if version_probe_policy == "always":
+                probe_version = True
+            elif version_probe_policy == "if_configured":
+                probe_version = agent.api_key_configured or agent_def.api_key_env_var is None
+            else:
+                probe_version = False
+            
+            if cli_cmd and probe_version:
                 # Get version
-                version_flag = agent_def.get("version_flag", "--version")
-                cmd = [cli_cmd, version_flag]
+                cmd = [cli_cmd, agent_def.version_flag]
                 
                 # Handle subcommands (e.g., gh copilot)
-                if "subcommand" in agent_def:
-                    cmd = [cli_cmd, agent_def["subcommand"], version_flag]
+                if agent_def.subcommand:
+                    cmd = [cli_cmd, agent_def.subcommand, agent_def.version_flag]
                 
                 success, stdout, stderr = self._run_command(cmd)
                 if success:
                     agent.version = self._extract_version(stdout or stderr)
             
-            # Check API key
-            if agent_def.get("api_key_env_var"):
-                agent.api_key_env_var = agent_def["api_key_env_var"]
-                agent.api_key_configured = bool(os.environ.get(agent_def["api_key_env_var"]))
-            
             # Check config file
-            if agent_def.get("config_path"):
-                config_path = Path(agent_def["config_path"]).expanduser()
+            if agent_def.config_path:
+                config_path = Path(agent_def.config_path).expanduser()
                 if config_path.exists():
                     agent.config_path = str(config_path)
             
@@ -630,17 +758,31 @@ class EnvDetector:
         
         return project_type, frameworks
     
-    def detect_all(self) -> EnvironmentInfo:
+    def detect_all(self, use_cache: bool = True) -> EnvironmentInfo:
         """
         Detect all environment information.
         
+        Results are cached on disk, keyed by project root, PATH and the
+        project marker files. Git status is always probed fresh since it
+        changes between runs.
+        
+        Args:
+            use_cache: Read and write the on-disk cache.
+        
         Returns:
             EnvironmentInfo object with complete detection results.
         """
+        cache_path = self._cache_path() if use_cache else None
+        if cache_path:
+            cached = self._load_cached(cache_path)
+            if cached:
+                cached.git = self.detect_git()
+                return cached
+        
         system = self.detect_system()
         project_type, frameworks = self.detect_project_type()
         
-        return EnvironmentInfo(
+        info = EnvironmentInfo(
             os_type=system["os_type"],
             os_version=system["os_version"],
             shell=system["shell"],
@@ -660,6 +802,11 @@ class EnvDetector:
             frameworks=[f.value for f in frameworks],
             project_root=str(self.project_root),
         )
+        
+        if cache_path:
+            self._save_cached(cache_path, info)
+        
+        return info
     
     def get_available_ai_agents(self) -> List[AIAgentInfo]:
         """Get list of AI agents that are both installed and configured."""
@@ -698,6 +845,7 @@ def main():
     parser.add_argument("--json", action="store_true", help="Output as JSON")
     parser.add_argument("--project-root", "-p", help="Project root directory")
     parser.add_argument("--agents-only", action="store_true", help="Only show AI agents")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore cached detection results")
     args = parser.parse_args()
     
     detector = EnvDetector(args.project_root)
@@ -718,7 +866,7 @@ def main():
                 if agent.version:
                     print(f"   Version: {agent.version}")
     else:
-        info = detector.detect_all()
+        info = detector.detect_all(use_cache=not args.no_cache)
         if args.json:
             print(json.dumps(info.to_dict(), indent=2))
         else:
@@ -3,24 +3,52 @@
 Rollback Manager - Snapshot and rollback functionality for AI-assisted development.
 
 Supports three modes:
-1. Git mode (recommended): Uses git stash for efficient snapshots
+1. Git mode (recommended): Records a stash commit for efficient snapshots
 2. File backup mode: Copies files for non-git projects
-3. Hybrid mode: Git for tracked files, backup for untracked
+3. Hybrid mode: Patch against HEAD for tracked files, backup for untracked
 """
 
 from __future__ import annotations
 
+import hashlib
 import json
 import os
 import shutil
 import subprocess
 import tarfile
-from dataclasses import dataclass, field, asdict
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, fields
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import List, Optional, Dict, Any, Iterator
+from typing import List, Optional, Dict, Any, Iterator, Set, Tuple
 from enum import Enum
 
+# Optional binary metadata sidecar, JSON stays the source of truth
+try:
+    import msgpack
+    HAS_MSGPACK = True
+except ImportError:
+    HAS_MSGPACK = False
+
+# Optional C-accelerated JSON encoder for the write paths
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+def _json_dumps(data: Any, pretty: bool = False) -> str:
+    """Serialize to JSON, compact by default (non-ASCII kept as-is)."""
+    if HAS_ORJSON:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if pretty else 0).decode("utf-8")
+    if pretty:
+        return json.dumps(data, indent=2, ensure_ascii=False)
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
 
 class SnapshotMode(Enum):
     """Snapshot storage mode."""
@@ -41,13 +69,21 @@ class Snapshot:
     files_modified: List[str] = field(default_factory=list)
     git_ref: Optional[str] = None
     backup_path: Optional[str] = None
+    base_commit: Optional[str] = None
+    tracked_files: List[str] = field(default_factory=list)
+    untracked_scanned: bool = True
     
     def to_dict(self) -> Dict[str, Any]:
-        return asdict(self)
+        # Shallow copy; asdict() would deep-copy every list field
+        return dict(self.__dict__)
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "Snapshot":
-        return cls(**data)
+        # Ignore keys written by newer versions
+        return cls(**{k: v for k, v in data.items() if k in _SNAPSHOT_FIELDS})
+
+
+_SNAPSHOT_FIELDS = frozenset(f.name for f in fields(Snapshot))
 
 
 @dataclass
@@ -82,41 +118,91 @@ class RollbackManager:
     STORAGE_DIR = ".ai-context"
     SNAPSHOTS_DIR = "snapshots"
     LOGS_DIR = "logs"
-    HISTORY_FILE = "rollback_history.json"
+    HISTORY_FILE = "rollback_history.jsonl"
+    LEGACY_HISTORY_FILE = "rollback_history.json"
     METADATA_FILE = "metadata.json"
+    METADATA_MSGPACK_FILE = "metadata.msgpack"
+    INDEX_FILE = "index.jsonl"
+    TRASH_DIR = ".trash"
     BACKUP_FILE = "files.tar.gz"
+    BACKUP_FILE_ZSTD = "files.tar.zst"
+    ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+    MANIFEST_FILE = "manifest.json"
+    OBJECTS_DIR = ".objects"
+    OBJECT_GC_GRACE_SECONDS = 3600
     STASH_REF_FILE = "stash_ref.txt"
+    PATCH_FILE = "patch.diff"
+    SNAPSHOT_REF_PREFIX = "refs/ai-context/"
+    UNTRACKED_SCAN_TIMEOUT = 2.0
+    
+    # Storage directories already set up by this process
+    _initialized: Set[Path] = set()
+    _init_lock = threading.Lock()
     
-    def __init__(self, project_root: Optional[Path] = None):
+    def __init__(self, project_root: Optional[Path] = None, pretty_json: bool = False):
         """
         Initialize RollbackManager.
         
         Args:
             project_root: Root directory of the project. Defaults to current directory.
+            pretty_json: Indent metadata.json for human readers (compact otherwise).
         """
         self.project_root = Path(project_root or Path.cwd()).resolve()
+        self.pretty_json = pretty_json
         self.storage_dir = self.project_root / self.STORAGE_DIR
         self.snapshots_dir = self.storage_dir / self.SNAPSHOTS_DIR
         self.logs_dir = self.storage_dir / self.LOGS_DIR
         self.history_file = self.logs_dir / self.HISTORY_FILE
+        self.index_file = self.snapshots_dir / self.INDEX_FILE
+        # Inside snapshots/ so the existing .gitignore already covers it
+        self.trash_dir = self.snapshots_dir / self.TRASH_DIR
+        self.objects_dir = self.snapshots_dir / self.OBJECTS_DIR
+        
+        # Read-only git commands must not take index.lock or rewrite the
+        # index, so they never contend with a concurrently running agent.
+        self._git_env = {**os.environ, "GIT_OPTIONAL_LOCKS": "0"}
+        self._is_git: Optional[bool] = None
+        self._scan_untracked: Optional[bool] = None
+        self._gc_thread: Optional[threading.Thread] = None
+        self._history_fp = None
+        self._history_lock = threading.Lock()
         
         self._ensure_directories()
+        
+        # Finish deletions left over from a previous process
+        if self.trash_dir.exists():
+            self._schedule_trash_gc()
     
     def _ensure_directories(self) -> None:
-        """Create necessary directories if they don't exist."""
-        self.snapshots_dir.mkdir(parents=True, exist_ok=True)
-        self.logs_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Create .gitignore for storage directory
-        gitignore = self.storage_dir / ".gitignore"
-        if not gitignore.exists():
-            gitignore.write_text("# AI Context storage\nsnapshots/\nlogs/\n", encoding="utf-8")
+        """Create necessary directories if they don't exist (once per process)."""
+        with RollbackManager._init_lock:
+            if self.storage_dir in RollbackManager._initialized:
+                return
+            
+            # snapshots/ creates the storage directory as its parent
+            self.snapshots_dir.mkdir(parents=True, exist_ok=True)
+            self.logs_dir.mkdir(exist_ok=True)
+            
+            # Create .gitignore for storage directory
+            gitignore = self.storage_dir / ".gitignore"
+            if not gitignore.exists():
+                gitignore.write_text("# AI Context storage\nsnapshots/\nlogs/\n", encoding="utf-8")
+            
+            RollbackManager._initialized.add(self.storage_dir)
     
     def _is_git_repo(self) -> bool:
-        """Check if project is a git repository."""
-        return (self.project_root / ".git").exists()
+        """Check if project is a git repository (cached per instance)."""
+        if self._is_git is None:
+            self._is_git = (self.project_root / ".git").exists()
+        return self._is_git
     
-    def _run_git(self, args: List[str], check: bool = True) -> subprocess.CompletedProcess:
+    def _run_git(
+        self,
+        args: List[str],
+        check: bool = True,
+        timeout: Optional[float] = None,
+        input: Optional[str] = None
+    ) -> subprocess.CompletedProcess:
         """Run a git command."""
         return subprocess.run(
             ["git", *args],
@@ -124,125 +210,492 @@ class RollbackManager:
             capture_output=True,
             text=True,
             check=check,
+            env=self._git_env,
+            timeout=timeout,
+            input=input,
         )
     
-    def _get_modified_files(self) -> List[str]:
-        """Get list of modified files in the working directory."""
-        if not self._is_git_repo():
-            return []
-        
-        result = self._run_git(["status", "--porcelain"], check=False)
-        if result.returncode != 0:
-            return []
+    def _untracked_scan_enabled(self) -> bool:
+        """Check ``status.showUntrackedFiles`` (cached per instance)."""
+        if self._scan_untracked is None:
+            result = self._run_git(["config", "--get", "status.showUntrackedFiles"], check=False)
+            self._scan_untracked = result.stdout.strip().lower() not in ("no", "false", "off", "0")
+        return self._scan_untracked
+    
+    def _get_status(self) -> Tuple[List[str], List[str], bool]:
+        """
+        Get modified and untracked files with a single ``git status`` call.
         
-        files = []
-        for line in result.stdout.splitlines():
-            if line.strip():
-                # Format: "XY filename" or "XY filename -> newname"
-                status = line[:2]
-                filename = line[3:].split(" -> ")[-1].strip()
-                if status.strip():  # Has some status
-                    files.append(filename)
+        The untracked scan is skipped when the repository sets
+        ``status.showUntrackedFiles=no``, or when it takes longer than
+        ``UNTRACKED_SCAN_TIMEOUT`` seconds (e.g. on a monorepo).
         
-        return files
-    
-    def _get_untracked_files(self) -> List[str]:
-        """Get list of untracked files."""
+        Returns:
+            Tuple of (modified files, untracked files, whether untracked
+            files were scanned). The storage directory itself is never
+            reported.
+        """
         if not self._is_git_repo():
-            return []
+            return [], [], True
         
-        result = self._run_git(["ls-files", "--others", "--exclude-standard"], check=False)
+        pathspec = ["--", ".", f":(exclude){self.STORAGE_DIR}"]
+        scanned = self._untracked_scan_enabled()
+        result = None
+        if scanned:
+            try:
+                result = self._run_git(
+                    ["status", "-z", "--porcelain=v1", "--untracked-files=all", *pathspec],
+                    check=False,
+                    timeout=self.UNTRACKED_SCAN_TIMEOUT
+                )
+            except subprocess.TimeoutExpired:
+                scanned = False
+        if result is None:
+            result = self._run_git(
+                ["status", "-z", "--porcelain=v1", "--untracked-files=no", *pathspec],
+                check=False
+            )
         if result.returncode != 0:
-            return []
+            return [], [], scanned
+        
+        modified: List[str] = []
+        untracked: List[str] = []
+        # Format: "XY path\0", renames/copies add the source: "XY new\0old\0"
+        entries = iter(result.stdout.split("\0"))
+        for entry in entries:
+            if len(entry) < 4:
+                continue
+            status, filename = entry[:2], entry[3:]
+            if status == "??":
+                untracked.append(filename)
+                continue
+            if status[0] in "RC":
+                next(entries, None)
+            modified.append(filename)
         
-        return [f.strip() for f in result.stdout.splitlines() if f.strip()]
+        return modified, untracked, scanned
     
     def _generate_snapshot_id(self) -> str:
         """Generate a unique snapshot ID."""
         timestamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
         return f"snap_{timestamp}"
     
-    def _determine_mode(self) -> SnapshotMode:
+    def _determine_mode(self, untracked: Optional[List[str]] = None) -> SnapshotMode:
         """Determine the best snapshot mode for this project."""
         if not self._is_git_repo():
             return SnapshotMode.FILE_BACKUP
         
-        untracked = self._get_untracked_files()
+        if untracked is None:
+            untracked = self._get_status()[1]
         if untracked:
             return SnapshotMode.HYBRID
         
         return SnapshotMode.GIT_STASH
     
     def _create_git_stash(self, snapshot_dir: Path, message: str) -> Optional[str]:
-        """Create a git stash and return the reference."""
-        # Include untracked files in stash
+        """
+        Record the working tree as a stash commit and return its SHA.
+        
+        ``git stash create`` builds the commit without touching the working
+        tree or the stash list; a ref under ``refs/ai-context/`` keeps it
+        from being garbage collected.
+        """
+        result = self._run_git(["stash", "create", f"ai-context: {message}"], check=False)
+        stash_sha = result.stdout.strip()
+        if result.returncode != 0 or not stash_sha:
+            return None
+        
         result = self._run_git(
-            ["stash", "push", "-u", "-m", f"ai-context: {message}"],
+            ["update-ref", f"{self.SNAPSHOT_REF_PREFIX}{snapshot_dir.name}", stash_sha],
             check=False
         )
+        if result.returncode != 0:
+            return None
+        
+        # Save reference to file
+        ref_file = snapshot_dir / self.STASH_REF_FILE
+        ref_file.write_text(stash_sha, encoding="utf-8")
         
+        return stash_sha
+    
+    def _create_patch(self, snapshot_dir: Path, files: List[str]) -> Optional[str]:
+        """
+        Save tracked-file changes as a binary patch against HEAD.
+        
+        Returns:
+            The base commit SHA, or None if no patch could be written
+            (e.g. a repository without commits).
+        """
+        result = self._run_git(["rev-parse", "--verify", "-q", "HEAD"], check=False)
+        base_commit = result.stdout.strip()
+        if result.returncode != 0 or not base_commit:
+            return None
+        
+        result = subprocess.run(
+            ["git", "diff", "--binary", base_commit, "--", *files],
+            cwd=self.project_root,
+            capture_output=True,
+            check=False,
+            env=self._git_env,
+        )
         if result.returncode != 0:
             return None
         
-        # Get the stash reference
-        result = self._run_git(["stash", "list"], check=False)
-        if result.returncode == 0 and result.stdout.strip():
-            # First line should be our stash
-            first_line = result.stdout.splitlines()[0]
-            if "ai-context:" in first_line:
-                stash_ref = first_line.split(":")[0]  # e.g., "stash@{0}"
-                
-                # Save reference to file
-                ref_file = snapshot_dir / self.STASH_REF_FILE
-                ref_file.write_text(stash_ref, encoding="utf-8")
-                
-                # Pop the stash to restore working state
-                # (we saved the ref, so we can restore later)
-                self._run_git(["stash", "pop"], check=False)
-                
-                return stash_ref
+        (snapshot_dir / self.PATCH_FILE).write_bytes(result.stdout)
+        return base_commit
+    
+    def _restore_patch(
+        self,
+        snapshot: Snapshot,
+        snapshot_dir: Path,
+        files: Optional[List[str]] = None
+    ) -> bool:
+        """Reset tracked files to the base commit and re-apply the snapshot patch."""
+        targets = snapshot.tracked_files
+        if files:
+            wanted = set(files)
+            targets = [f for f in targets if f in wanted]
+        if not targets:
+            return True
+        
+        result = self._run_git(
+            ["ls-tree", "-r", "-z", "--name-only", snapshot.base_commit, "--", *targets],
+            check=False
+        )
+        if result.returncode != 0:
+            return False
+        in_base = [name for name in result.stdout.split("\0") if name]
         
-        return None
+        # Files absent from the base commit are recreated by the patch
+        in_base_set = set(in_base)
+        for file_path in targets:
+            if file_path not in in_base_set:
+                (self.project_root / file_path).unlink(missing_ok=True)
+        if in_base:
+            result = self._run_git(
+                ["restore", f"--source={snapshot.base_commit}", "--worktree", "--", *in_base],
+                check=False
+            )
+            if result.returncode != 0:
+                return False
+        
+        patch_file = snapshot_dir / self.PATCH_FILE
+        if not patch_file.exists() or patch_file.stat().st_size == 0:
+            return True
+        args = ["apply", "--binary", "--whitespace=nowarn"]
+        if files:
+            args += [f"--include={f}" for f in targets]
+        result = self._run_git([*args, str(patch_file)], check=False)
+        return result.returncode == 0
+    
+    def _native_tar(self) -> Optional[str]:
+        """Get the system tar binary, or None to use the tarfile module."""
+        if os.name == "nt":
+            return None
+        return shutil.which("tar")
+    
+    def _iter_backup_files(self, files: List[str]) -> Iterator[str]:
+        """Expand a file list to regular files, descending into directories."""
+        for file_path in files:
+            path = self.project_root / file_path
+            if path.is_dir():
+                for dirpath, _, filenames in os.walk(path):
+                    rel_dir = Path(dirpath).relative_to(self.project_root)
+                    for filename in filenames:
+                        yield (rel_dir / filename).as_posix()
+            elif path.exists():
+                yield file_path
+    
+    def _object_path(self, digest: str) -> Path:
+        """Get the object store path for a content hash."""
+        return self.objects_dir / digest[:2] / digest[2:]
+    
+    def _store_object(self, source: Path) -> str:
+        """Copy a file into the object store, skipping content already stored."""
+        data = source.read_bytes()
+        digest = hashlib.blake2b(data, digest_size=20).hexdigest()
+        object_path = self._object_path(digest)
+        if object_path.exists():
+            # Refresh mtime so the GC grace period covers reused objects
+            os.utime(object_path)
+            return digest
+        
+        object_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = object_path.with_name(f"{object_path.name}.{uuid.uuid4().hex}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, object_path)
+        return digest
     
     def _create_file_backup(self, snapshot_dir: Path, files: List[str]) -> str:
-        """Create a tar.gz backup of specified files."""
-        backup_path = snapshot_dir / self.BACKUP_FILE
+        """
+        Back up specified files into the content-addressed object store.
         
-        with tarfile.open(backup_path, "w:gz") as tar:
-            for file_path in files:
-                full_path = self.project_root / file_path
-                if full_path.exists():
-                    tar.add(full_path, arcname=file_path)
+        Each file is stored once under ``objects/`` keyed by its blake2b hash;
+        the snapshot's manifest maps paths to hashes, so unchanged files are
+        shared between snapshots.
+        """
+        manifest: Dict[str, Dict[str, Any]] = {}
+        for file_path in self._iter_backup_files(files):
+            source = self.project_root / file_path
+            manifest[file_path] = {
+                "hash": self._store_object(source),
+                "mode": source.stat().st_mode & 0o777,
+            }
         
-        return str(backup_path)
+        manifest_path = snapshot_dir / self.MANIFEST_FILE
+        manifest_path.write_text(_json_dumps(manifest), encoding="utf-8")
+        return str(manifest_path)
     
-    def _load_history(self) -> List[Dict[str, Any]]:
-        """Load rollback history."""
-        if not self.history_file.exists():
-            return []
-        
+    def _restore_manifest(self, manifest_path: Path, files: Optional[List[str]] = None) -> bool:
+        """Copy files listed in a snapshot manifest back from the object store."""
         try:
-            return json.loads(self.history_file.read_text(encoding="utf-8"))
+            manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
         except (json.JSONDecodeError, OSError):
-            return []
+            return False
+        
+        if files:
+            manifest = {path: manifest[path] for path in set(files) if path in manifest}
+        
+        for file_path, entry in manifest.items():
+            target = self.project_root / file_path
+            try:
+                target.parent.mkdir(parents=True, exist_ok=True)
+                # Copy rather than hard-link so later edits cannot reach the store
+                shutil.copyfile(self._object_path(entry["hash"]), target)
+                os.chmod(target, entry["mode"])
+            except OSError:
+                return False
+        return True
+    
+    def _find_file_backup(self, snapshot_dir: Path) -> Optional[Path]:
+        """Get the backup manifest (or legacy archive) in a snapshot directory, if any."""
+        for name in (self.MANIFEST_FILE, self.BACKUP_FILE_ZSTD, self.BACKUP_FILE):
+            backup_file = snapshot_dir / name
+            if backup_file.exists():
+                return backup_file
+        return None
     
-    def _save_history(self, history: List[Dict[str, Any]]) -> None:
-        """Save rollback history."""
-        self.history_file.write_text(
-            json.dumps(history, indent=2, ensure_ascii=False),
+    def _extract_file_backup(self, backup_file: Path, files: Optional[List[str]] = None) -> bool:
+        """Extract a file backup into the project root (all files or a subset)."""
+        if backup_file.name == self.MANIFEST_FILE:
+            return self._restore_manifest(backup_file, files)
+        
+        # Tar archives written by older versions
+        with open(backup_file, "rb") as fh:
+            is_zstd = fh.read(4) == self.ZSTD_MAGIC
+        
+        tar_cmd = self._native_tar()
+        if is_zstd:
+            zstd_cmd = shutil.which("zstd")
+            if not (tar_cmd and zstd_cmd):
+                return False
+            zstd_proc = subprocess.Popen(
+                [zstd_cmd, "-q", "-d", "-c", str(backup_file)],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+            args = [tar_cmd, "-xf", "-", "-C", str(self.project_root)]
+            if files:
+                args += ["--", *files]
+            tar_proc = subprocess.Popen(
+                args,
+                stdin=zstd_proc.stdout,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            zstd_proc.stdout.close()
+            tar_ok = tar_proc.wait() == 0
+            zstd_ok = zstd_proc.wait() == 0
+            # Selective restores may name files absent from the archive
+            return zstd_ok and (tar_ok or bool(files))
+        
+        if tar_cmd:
+            args = [tar_cmd, "-xzf", str(backup_file), "-C", str(self.project_root)]
+            stdin = None
+            if files:
+                args += ["--null", "-T", "-"]
+                stdin = "\0".join(files).encode("utf-8")
+            result = subprocess.run(args, input=stdin, capture_output=True, check=False)
+            if result.returncode == 0:
+                return True
+        
+        with tarfile.open(backup_file, "r:gz") as tar:
+            if files:
+                # Look up only the requested members
+                for name in set(files):
+                    try:
+                        member = tar.getmember(name)
+                    except KeyError:
+                        continue
+                    tar.extract(member, self.project_root)
+            else:
+                # Extract all files
+                tar.extractall(self.project_root)
+        return True
+    
+    def _write_metadata(self, snapshot_dir: Path, snapshot: Snapshot) -> None:
+        """Write snapshot metadata (JSON, plus msgpack when available)."""
+        data = snapshot.to_dict()
+        metadata_file = snapshot_dir / self.METADATA_FILE
+        metadata_file.write_text(
+            _json_dumps(data, pretty=self.pretty_json),
             encoding="utf-8"
         )
+        if HAS_MSGPACK:
+            (snapshot_dir / self.METADATA_MSGPACK_FILE).write_bytes(
+                msgpack.packb(data, use_bin_type=True)
+            )
+    
+    def _read_metadata(self, snapshot_dir: Path) -> Optional[Snapshot]:
+        """Read snapshot metadata, preferring the msgpack sidecar."""
+        if HAS_MSGPACK:
+            try:
+                data = msgpack.unpackb(
+                    (snapshot_dir / self.METADATA_MSGPACK_FILE).read_bytes(),
+                    raw=False
+                )
+                return Snapshot.from_dict(data)
+            except (OSError, ValueError, TypeError, msgpack.UnpackException):
+                pass
+        
+        try:
+            data = json.loads((snapshot_dir / self.METADATA_FILE).read_text(encoding="utf-8"))
+            return Snapshot.from_dict(data)
+        except (json.JSONDecodeError, OSError, TypeError):
+            return None
+    
+    def _append_index(self, *entries: Dict[str, Any]) -> None:
+        """Append entries (snapshots or tombstones) to the snapshot index in one write."""
+        if not self.index_file.exists():
+            # First write: seed from disk so older snapshots are not dropped
+            self._write_index(self._scan_snapshots())
+            return
+        with open(self.index_file, "a", encoding="utf-8") as fh:
+            fh.write("".join(_json_dumps(entry) + "\n" for entry in entries))
+    
+    def _write_index(self, snapshots: List[Snapshot]) -> None:
+        """Rewrite the snapshot index from scratch."""
+        tmp_file = self.index_file.with_suffix(".tmp")
+        with open(tmp_file, "w", encoding="utf-8") as fh:
+            for snapshot in snapshots:
+                fh.write(_json_dumps(snapshot.to_dict()) + "\n")
+        os.replace(tmp_file, self.index_file)
     
-    def _add_to_history(self, action: str, snapshot_id: str, details: Dict[str, Any] = None) -> None:
-        """Add an entry to rollback history."""
-        history = self._load_history()
-        history.append({
+    def _read_index(self) -> Optional[List[Snapshot]]:
+        """
+        Read snapshots from the index.
+        
+        Returns:
+            Live snapshots, or None if the index is missing or corrupt.
+        """
+        entries: Dict[str, Snapshot] = {}
+        tombstones = 0
+        try:
+            with open(self.index_file, encoding="utf-8") as fh:
+                for line in fh:
+                    data = json.loads(line)
+                    if data.get("deleted"):
+                        entries.pop(data["id"], None)
+                        tombstones += 1
+                    else:
+                        snapshot = Snapshot.from_dict(data)
+                        entries[snapshot.id] = snapshot
+        except (OSError, json.JSONDecodeError, KeyError, TypeError):
+            return None
+        
+        snapshots = list(entries.values())
+        if tombstones > len(snapshots):
+            # Compact once deletions dominate the log
+            self._write_index(snapshots)
+        return snapshots
+    
+    def _scan_snapshots(self) -> List[Snapshot]:
+        """Read every snapshot's metadata from disk (index rebuild)."""
+        # DirEntry.is_dir() uses the type from the directory listing, no stat()
+        try:
+            with os.scandir(self.snapshots_dir) as it:
+                snapshot_dirs = [
+                    Path(entry.path) for entry in it
+                    if entry.is_dir(follow_symlinks=False) and not entry.name.startswith(".")
+                ]
+        except FileNotFoundError:
+            return []
+        if not snapshot_dirs:
+            return []
+        
+        # File reads release the GIL, so a small pool overlaps the I/O
+        with ThreadPoolExecutor(max_workers=min(32, len(snapshot_dirs))) as pool:
+            results = pool.map(self._read_metadata, snapshot_dirs)
+        
+        return [snapshot for snapshot in results if snapshot]
+    
+    def _load_history(self) -> Iterator[Dict[str, Any]]:
+        """Iterate rollback history entries, oldest first."""
+        legacy_file = self.logs_dir / self.LEGACY_HISTORY_FILE
+        if legacy_file.exists():
+            try:
+                yield from json.loads(legacy_file.read_text(encoding="utf-8"))
+            except (json.JSONDecodeError, OSError):
+                pass
+        
+        if not self.history_file.exists():
+            return
+        
+        try:
+            with open(self.history_file, encoding="utf-8") as fh:
+                for line in fh:
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+        except OSError:
+            return
+    
+    def _add_to_history(
+        self,
+        action: str,
+        snapshot_id: str,
+        details: Dict[str, Any] = None,
+        durable: bool = False
+    ) -> None:
+        """
+        Append an entry to rollback history.
+        
+        The history file stays open (unbuffered, append-only) for the life
+        of the manager, so each entry is a single write() call.
+        
+        Args:
+            action: History action name
+            snapshot_id: Snapshot the action applies to
+            details: Extra details to record
+            durable: fsync after writing (use when the caller needs a barrier)
+        """
+        entry = {
             "timestamp": datetime.now(timezone.utc).isoformat(),
             "action": action,
             "snapshot_id": snapshot_id,
             "details": details or {},
-        })
-        self._save_history(history)
+        }
+        line = (_json_dumps(entry) + "\n").encode("utf-8")
+        with self._history_lock:
+            if self._history_fp is None:
+                self._history_fp = open(self.history_file, "ab", buffering=0)
+            self._history_fp.write(line)
+            if durable:
+                os.fsync(self._history_fp.fileno())
+    
+    def sync(self) -> None:
+        """Flush history entries to disk (fsync) without closing the file."""
+        with self._history_lock:
+            if self._history_fp is not None:
+                os.fsync(self._history_fp.fileno())
+    
+    def close(self) -> None:
+        """Close the history file; it is reopened on the next write."""
+        with self._history_lock:
+            if self._history_fp is not None:
+                self._history_fp.close()
+                self._history_fp = None
     
     def create_snapshot(
         self,
@@ -267,8 +720,9 @@ class RollbackManager:
         snapshot_dir = self.snapshots_dir / snapshot_id
         snapshot_dir.mkdir(parents=True, exist_ok=True)
         
-        mode = self._determine_mode()
-        modified_files = files or self._get_modified_files()
+        modified, untracked, untracked_scanned = self._get_status()
+        mode = self._determine_mode(untracked)
+        modified_files = files or modified + untracked
         
         git_ref = None
         backup_path = None
@@ -279,8 +733,18 @@ class RollbackManager:
                 # Fallback to file backup if stash fails
                 mode = SnapshotMode.FILE_BACKUP
         
+        base_commit = None
+        tracked_files: List[str] = []
+        
         if mode in (SnapshotMode.FILE_BACKUP, SnapshotMode.HYBRID):
-            all_files = modified_files + self._get_untracked_files()
+            all_files = list(dict.fromkeys(modified_files + untracked))
+            if mode == SnapshotMode.HYBRID:
+                untracked_set = set(untracked)
+                tracked = [f for f in all_files if f not in untracked_set]
+                base_commit = self._create_patch(snapshot_dir, tracked) if tracked else None
+                if base_commit:
+                    tracked_files = tracked
+                    all_files = [f for f in all_files if f in untracked_set]
             if all_files:
                 backup_path = self._create_file_backup(snapshot_dir, all_files)
         
@@ -294,14 +758,14 @@ class RollbackManager:
             files_modified=modified_files,
             git_ref=git_ref,
             backup_path=backup_path,
+            base_commit=base_commit,
+            tracked_files=tracked_files,
+            untracked_scanned=untracked_scanned,
         )
         
         # Save metadata
-        metadata_file = snapshot_dir / self.METADATA_FILE
-        metadata_file.write_text(
-            json.dumps(snapshot.to_dict(), indent=2, ensure_ascii=False),
-            encoding="utf-8"
-        )
+        self._write_metadata(snapshot_dir, snapshot)
+        self._append_index(snapshot.to_dict())
         
         self._add_to_history("create", snapshot_id, {
             "task_id": task_id,
@@ -318,24 +782,15 @@ class RollbackManager:
         Returns:
             List of Snapshot objects, sorted by creation time (newest first)
         """
-        snapshots = []
-        
-        if not self.snapshots_dir.exists():
-            return snapshots
-        
-        for snapshot_dir in self.snapshots_dir.iterdir():
-            if not snapshot_dir.is_dir():
-                continue
-            
-            metadata_file = snapshot_dir / self.METADATA_FILE
-            if not metadata_file.exists():
-                continue
-            
+        # A missing snapshots dir reads as no index and an empty scan
+        snapshots = self._read_index()
+        if snapshots is None:
+            # Missing or corrupt index (e.g. snapshots from an older version)
+            snapshots = self._scan_snapshots()
             try:
-                data = json.loads(metadata_file.read_text(encoding="utf-8"))
-                snapshots.append(Snapshot.from_dict(data))
-            except (json.JSONDecodeError, OSError, TypeError):
-                continue
+                self._write_index(snapshots)
+            except OSError:
+                pass
         
         # Sort by creation time, newest first
         snapshots.sort(key=lambda s: s.created_at, reverse=True)
@@ -351,24 +806,16 @@ class RollbackManager:
         Returns:
             Snapshot object or None if not found
         """
-        snapshot_dir = self.snapshots_dir / snapshot_id
-        metadata_file = snapshot_dir / self.METADATA_FILE
-        
-        if not metadata_file.exists():
-            return None
-        
-        try:
-            data = json.loads(metadata_file.read_text(encoding="utf-8"))
-            return Snapshot.from_dict(data)
-        except (json.JSONDecodeError, OSError, TypeError):
-            return None
+        return self._read_metadata(self.snapshots_dir / snapshot_id)
     
-    def diff(self, snapshot_id: str) -> Optional[DiffResult]:
+    def diff(self, snapshot_id: str, include_content: bool = False) -> Optional[DiffResult]:
         """
         Compare current state with a snapshot.
         
         Args:
             snapshot_id: The snapshot ID to compare against
+            include_content: Also fetch the full patch into ``diff_content``
+                (an extra git call; off when only file lists are needed)
         
         Returns:
             DiffResult object or None if snapshot not found
@@ -376,8 +823,15 @@ class RollbackManager:
         snapshot = self.get_snapshot(snapshot_id)
         if not snapshot:
             return None
+        return self.diff_for(snapshot, include_content)
+    
+    def diff_for(self, snapshot: Snapshot, include_content: bool = False) -> DiffResult:
+        """
+        Compare current state with an already loaded snapshot.
         
-        result = DiffResult(snapshot_id=snapshot_id)
+        Same as ``diff()``, without reading the snapshot metadata again.
+        """
+        result = DiffResult(snapshot_id=snapshot.id)
         
         if self._is_git_repo():
             # Use git diff for more accurate results
@@ -396,10 +850,10 @@ class RollbackManager:
                         elif status.startswith("D"):
                             result.files_deleted.append(filename)
             
-            # Get full diff content
-            full_diff = self._run_git(["diff"], check=False)
-            if full_diff.returncode == 0:
-                result.diff_content = full_diff.stdout
+            if include_content:
+                full_diff = self._run_git(["diff"], check=False)
+                if full_diff.returncode == 0:
+                    result.diff_content = full_diff.stdout
         else:
             # For non-git projects, compare with backup
             result.files_modified = snapshot.files_modified
@@ -424,37 +878,61 @@ class RollbackManager:
         snapshot = self.get_snapshot(snapshot_id)
         if not snapshot:
             return False
+        return self.rollback_for(snapshot, files)
+    
+    def rollback_for(self, snapshot: Snapshot, files: Optional[List[str]] = None) -> bool:
+        """
+        Rollback to an already loaded snapshot.
         
+        Same as ``rollback()``, without reading the snapshot metadata again.
+        """
+        snapshot_id = snapshot.id
         snapshot_dir = self.snapshots_dir / snapshot_id
         success = False
         
         if snapshot.mode == SnapshotMode.GIT_STASH.value and snapshot.git_ref:
-            # Restore from git stash
+            # Snapshots from older versions stored a popped "stash@{n}" ref,
+            # which no longer points at the snapshot; fall back to HEAD.
+            legacy_ref = snapshot.git_ref.startswith("stash@")
             if files:
                 # Selective rollback using git checkout
+                source = "HEAD" if legacy_ref else snapshot.git_ref
                 for file in files:
-                    self._run_git(["checkout", "HEAD", "--", file], check=False)
+                    self._run_git(["checkout", source, "--", file], check=False)
                 success = True
-            else:
+            elif legacy_ref:
                 # Full rollback - reset to clean state
                 self._run_git(["checkout", "--", "."], check=False)
-                self._run_git(["clean", "-fd"], check=False)
+                self._run_git(["clean", "-fd", "-e", self.STORAGE_DIR], check=False)
                 success = True
+            else:
+                # Full rollback - one pass over index + worktree to the
+                # snapshot's working tree, then restore its staged state
+                # (second parent of the stash commit) without touching files
+                result = self._run_git(
+                    ["read-tree", "--reset", "-u", f"{snapshot.git_ref}^{{tree}}"],
+                    check=False
+                )
+                success = result.returncode == 0
+                if success:
+                    self._run_git(["read-tree", "--reset", f"{snapshot.git_ref}^2"], check=False)
+                    # GIT_STASH snapshots had no untracked files, so anything
+                    # untracked now was created afterwards - unless the scan
+                    # was skipped, in which case untracked files are left alone
+                    if snapshot.untracked_scanned:
+                        self._run_git(["clean", "-fd", "-e", self.STORAGE_DIR], check=False)
         
-        elif snapshot.backup_path or (snapshot_dir / self.BACKUP_FILE).exists():
+        else:
+            if snapshot.base_commit:
+                # Tracked files from the HYBRID patch
+                success = self._restore_patch(snapshot, snapshot_dir, files)
+                if not success:
+                    return False
+            
             # Restore from file backup
-            backup_file = snapshot_dir / self.BACKUP_FILE
-            if backup_file.exists():
-                with tarfile.open(backup_file, "r:gz") as tar:
-                    if files:
-                        # Extract only specified files
-                        for member in tar.getmembers():
-                            if member.name in files:
-                                tar.extract(member, self.project_root)
-                    else:
-                        # Extract all files
-                        tar.extractall(self.project_root)
-                success = True
+            backup_file = self._find_file_backup(snapshot_dir)
+            if backup_file:
+                success = self._extract_file_backup(backup_file, files)
         
         if success:
             self._add_to_history("rollback", snapshot_id, {
@@ -480,12 +958,140 @@ class RollbackManager:
             return False
         
         try:
-            shutil.rmtree(snapshot_dir)
+            # Renaming is O(1); the recursive delete runs in the background
+            self.trash_dir.mkdir(exist_ok=True)
+            os.replace(snapshot_dir, self.trash_dir / f"{snapshot_id}.{uuid.uuid4().hex}")
+            self._append_index({"id": snapshot_id, "deleted": True})
+            if self._is_git_repo():
+                self._run_git(
+                    ["update-ref", "-d", f"{self.SNAPSHOT_REF_PREFIX}{snapshot_id}"],
+                    check=False
+                )
             self._add_to_history("delete", snapshot_id)
+            self._schedule_trash_gc()
             return True
         except OSError:
             return False
     
+    def delete_batch(self, snapshot_ids: List[str]) -> int:
+        """
+        Delete several snapshots at once.
+        
+        Same as calling ``delete_snapshot()`` for each ID, but the index,
+        the git refs and the trash GC are updated once for the whole batch.
+        
+        Args:
+            snapshot_ids: The snapshot IDs to delete
+        
+        Returns:
+            Number of snapshots deleted
+        """
+        try:
+            self.trash_dir.mkdir(exist_ok=True)
+        except OSError:
+            return 0
+        
+        deleted = []
+        for snapshot_id in snapshot_ids:
+            try:
+                os.replace(
+                    self.snapshots_dir / snapshot_id,
+                    self.trash_dir / f"{snapshot_id}.{uuid.uuid4().hex}"
+                )
+            except OSError:
+                continue
+            deleted.append(snapshot_id)
+        if not deleted:
+            return 0
+        
+        try:
+            self._append_index(*({"id": snapshot_id, "deleted": True} for snapshot_id in deleted))
+        except OSError:
+            # A stale index would still list the moved snapshots; rebuild it
+            # from disk on the next listing instead
+            try:
+                self.index_file.unlink()
+            except OSError:
+                pass
+        if self._is_git_repo():
+            self._run_git(
+                ["update-ref", "--stdin"],
+                check=False,
+                input="".join(
+                    f"delete {self.SNAPSHOT_REF_PREFIX}{snapshot_id}\n" for snapshot_id in deleted
+                ),
+            )
+        for snapshot_id in deleted:
+            self._add_to_history("delete", snapshot_id)
+        self._schedule_trash_gc()
+        return len(deleted)
+    
+    def _empty_trash(self) -> None:
+        """Remove everything in the trash directory."""
+        while True:
+            try:
+                with os.scandir(self.trash_dir) as it:
+                    entries = [entry.path for entry in it]
+            except OSError:
+                return
+            if not entries:
+                return
+            for entry in entries:
+                shutil.rmtree(entry, ignore_errors=True)
+            self._prune_objects()
+    
+    def _prune_objects(self) -> None:
+        """Remove stored objects no longer referenced by any snapshot manifest."""
+        if not self.objects_dir.exists():
+            return
+        
+        referenced = set()
+        with os.scandir(self.snapshots_dir) as it:
+            snapshot_dirs = [
+                entry.path for entry in it
+                if entry.is_dir(follow_symlinks=False) and not entry.name.startswith(".")
+            ]
+        for snapshot_dir in snapshot_dirs:
+            manifest_path = Path(snapshot_dir) / self.MANIFEST_FILE
+            try:
+                manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+            except FileNotFoundError:
+                # Git-only or legacy tar snapshot
+                continue
+            except (json.JSONDecodeError, OSError):
+                # Unreadable manifest: keep everything rather than guess
+                return
+            referenced.update(entry["hash"] for entry in manifest.values())
+        
+        # Recently written or reused objects may belong to a snapshot whose
+        # manifest has not been written yet
+        cutoff = time.time() - self.OBJECT_GC_GRACE_SECONDS
+        with os.scandir(self.objects_dir) as it:
+            fanout_dirs = [entry for entry in it if entry.is_dir(follow_symlinks=False)]
+        for fanout in fanout_dirs:
+            try:
+                with os.scandir(fanout.path) as it:
+                    objects = list(it)
+            except OSError:
+                continue
+            for entry in objects:
+                try:
+                    if (fanout.name + entry.name) not in referenced and entry.stat().st_mtime < cutoff:
+                        os.unlink(entry.path)
+                except OSError:
+                    continue
+    
+    def _schedule_trash_gc(self) -> None:
+        """Empty the trash on a background thread (one at a time)."""
+        if self._gc_thread and self._gc_thread.is_alive():
+            return
+        # Non-daemon: pending deletes finish before the interpreter exits
+        self._gc_thread = threading.Thread(
+            target=self._empty_trash,
+            name="ai-context-trash-gc",
+        )
+        self._gc_thread.start()
+    
     def cleanup_old_snapshots(self, keep_count: int = 10) -> int:
         """
         Remove old snapshots, keeping only the most recent ones.
@@ -501,12 +1107,7 @@ class RollbackManager:
         if len(snapshots) <= keep_count:
             return 0
         
-        deleted = 0
-        for snapshot in snapshots[keep_count:]:
-            if self.delete_snapshot(snapshot.id):
-                deleted += 1
-        
-        return deleted
+        return self.delete_batch([snapshot.id for snapshot in snapshots[keep_count:]])
     
     def get_latest_snapshot(self) -> Optional[Snapshot]:
         """Get the most recent snapshot."""
@@ -523,9 +1124,10 @@ def main():
     parser.add_argument("--create", metavar="DESC", help="Create snapshot")
     parser.add_argument("--rollback", metavar="ID", help="Rollback to snapshot")
     parser.add_argument("--diff", metavar="ID", help="Show diff for snapshot")
+    parser.add_argument("--pretty", action="store_true", help="Write indented metadata.json")
     args = parser.parse_args()
     
-    manager = RollbackManager()
+    manager = RollbackManager(pretty_json=args.pretty)
     
     if args.list:
         snapshots = manager.list_snapshots()
@@ -17,11 +17,29 @@ Usage:
 from __future__ import annotations
 
 import argparse
+import hashlib
+import importlib.util
+import io
+import json
+import os
+import re
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stderr, redirect_stdout
 from datetime import datetime, timezone
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
-from typing import Optional, List
+from types import ModuleType
+from typing import Iterator, Optional, List
+
+# Optional libgit2 bindings: read repository status without spawning git
+try:
+    import pygit2
+    HAS_PYGIT2 = True
+except ImportError:
+    HAS_PYGIT2 = False
 
 # Add script directory to path
 SCRIPT_DIR = Path(__file__).resolve().parent
@@ -40,9 +58,13 @@ class Colors:
     GRAY = "\033[90m"
 
 
+# Checked once; honours the NO_COLOR convention (https://no-color.org)
+USE_COLOR = "NO_COLOR" not in os.environ and sys.stdout.isatty()
+
+
 def colorize(text: str, color: str) -> str:
     """Apply color if terminal supports it."""
-    if sys.stdout.isatty():
+    if USE_COLOR:
         return f"{color}{text}{Colors.RESET}"
     return text
 
@@ -51,64 +73,227 @@ def colorize(text: str, color: str) -> str:
 ROOT = SCRIPT_DIR.parent
 LATEST_BRIEF = ROOT / "docs" / "task-briefs" / "latest.md"
 ARCHIVE_DIR = ROOT / "docs" / "task-briefs" / "archive"
+CACHE_DIR_NAME = "ai-context-toolkit"
+BRIEF_META_RE = re.compile(r"^- (Title|Type|Branch):[ \t]*(.*)$", re.MULTILINE)
+BRIEF_DESC_RE = re.compile(r"## Description(.*?)(?:##|\Z)", re.DOTALL)
+
+
+# Global git options: reuse the untracked cache, never take optional locks
+GIT_GLOBAL_ARGS = ["-c", "core.untrackedCache=true", "--no-optional-locks"]
+# Untranslated output (the "nothing to commit" check relies on it); the rest
+# of the environment is kept for hooks, signing and GIT_* overrides
+GIT_ENV = {**os.environ, "LC_ALL": "C"}
+NUL_ENTRY_RE = re.compile(rb"[^\0]+")
+# A porcelain entry with a rename/copy status (only these are followed by a source path)
+RENAME_ENTRY_RE = re.compile(rb"(?:^|\0)[RC]")
+SHORTSTAT_RE = re.compile(r"\s*(\d+) files? changed")
+# Untracked paths relative to the repository root, like `git status`
+UNTRACKED_FILES_ARGS = [
+    "ls-files", "-z", "--others", "--exclude-standard", "--directory",
+    "--full-name", "--", ":/",
+]
 
 
 def run_git(args: List[str]) -> tuple[int, str, str]:
     """Run a git command and return (returncode, stdout, stderr)."""
     result = subprocess.run(
-        ["git", *args],
+        ["git", *GIT_GLOBAL_ARGS, *args],
         cwd=ROOT.parent,  # Project root
+        stdin=subprocess.DEVNULL,
         capture_output=True,
         text=True,
         check=False,
+        env=GIT_ENV,
     )
     return result.returncode, result.stdout.strip(), result.stderr.strip()
 
 
-def get_changed_files() -> List[str]:
-    """Get list of changed files."""
-    code, stdout, _ = run_git(["status", "--porcelain"])
+def run_git_raw(args: List[str]) -> tuple[int, bytes]:
+    """Run a git command and return (returncode, undecoded stdout)."""
+    result = subprocess.run(
+        ["git", *GIT_GLOBAL_ARGS, *args],
+        cwd=ROOT.parent,  # Project root
+        stdin=subprocess.DEVNULL,
+        capture_output=True,
+        check=False,
+        env=GIT_ENV,
+    )
+    return result.returncode, result.stdout
+
+
+@lru_cache(maxsize=1)
+def open_repository() -> Optional["pygit2.Repository"]:
+    """Open the project repository with pygit2, or None if unavailable."""
+    if not HAS_PYGIT2:
+        return None
+    try:
+        path = pygit2.discover_repository(str(ROOT.parent))
+        if path is None:
+            return None
+        repo = pygit2.Repository(path)
+    except pygit2.GitError:
+        return None
+    return None if repo.is_bare else repo
+
+
+def _repository_status(repo: "pygit2.Repository") -> Iterator[str]:
+    """Iterate changed paths from libgit2 status (untracked dirs not expanded)."""
+    for path, flags in repo.status(untracked_files="normal").items():
+        if flags != pygit2.enums.FileStatus.CURRENT:
+            yield path
+
+
+def _changed_files_output() -> Optional[bytes]:
+    """
+    Get changed paths as NUL-terminated entries, or None if git failed.
+    
+    Tracked changes come from the index; only the untracked listing walks
+    the tree, so the two run in parallel instead of a full `git status`.
+    Output stays as bytes; only the paths actually used get decoded.
+    """
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        tracked = pool.submit(run_git_raw, ["diff", "--name-only", "-z", "HEAD"])
+        untracked = pool.submit(run_git_raw, UNTRACKED_FILES_ARGS)
+        tracked_code, tracked_out = tracked.result()
+        untracked_code, untracked_out = untracked.result()
+    
+    if tracked_code != 0 or untracked_code != 0:
+        return None
+    return tracked_out + untracked_out
+
+
+def get_changed_files(limit: Optional[int] = None) -> List[str]:
+    """Get list of changed files (tracked changes plus untracked files)."""
+    repo = open_repository()
+    if repo is not None:
+        return list(islice(_repository_status(repo), limit))
+    
+    output = _changed_files_output()
+    if output is not None:
+        # Stop after `limit` entries without splitting the whole output
+        entries = (os.fsdecode(m.group()) for m in NUL_ENTRY_RE.finditer(output))
+        return list(islice(entries, limit))
+    
+    # Fallback (e.g. no commits yet, so HEAD does not resolve)
+    code, stdout = run_git_raw(["status", "-z", "--porcelain"])
     if code != 0:
         return []
     
+    # Format: "XY path\0"; renames/copies add the source: "XY new\0old\0"
+    entries = stdout.split(b"\0")
+    if not RENAME_ENTRY_RE.search(stdout):
+        return [os.fsdecode(entry[3:]) for entry in entries[:limit] if len(entry) > 3]
+    
+    # Second pass only when a rename/copy source has to be skipped
     files = []
-    for line in stdout.splitlines():
-        if line.strip():
-            # Format: "XY filename"
-            filename = line[3:].strip()
-            if " -> " in filename:
-                filename = filename.split(" -> ")[-1]
-            files.append(filename)
-    return files
-
-
-def parse_task_brief() -> dict:
-    """Parse the task brief to extract metadata."""
+    it = iter(entries)
+    for entry in it:
+        if len(entry) < 4:
+            continue
+        if entry[:1] in (b"R", b"C"):
+            next(it, None)
+        files.append(os.fsdecode(entry[3:]))
+    return files[:limit]
+
+
+def count_changed_files() -> int:
+    """
+    Count changed files without building the file list.
+    
+    Tracked changes come from ``git diff --shortstat`` (one summary line
+    instead of every path); untracked files are counted from the NUL
+    separators of the untracked listing. With pygit2 it is a single
+    in-process status call.
+    """
+    repo = open_repository()
+    if repo is not None:
+        return sum(1 for _ in _repository_status(repo))
+    
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        tracked = pool.submit(run_git, ["diff", "--shortstat", "HEAD"])
+        untracked = pool.submit(run_git_raw, UNTRACKED_FILES_ARGS)
+        tracked_code, tracked_out, _ = tracked.result()
+        untracked_code, untracked_out = untracked.result()
+    
+    if tracked_code != 0 or untracked_code != 0:
+        return len(get_changed_files())
+    
+    match = SHORTSTAT_RE.match(tracked_out)
+    return (int(match.group(1)) if match else 0) + untracked_out.count(b"\0")
+
+
+def _brief_cache_path() -> Path:
+    """Get the user-level cache file for parsed task brief metadata."""
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    key = hashlib.blake2b(str(LATEST_BRIEF).encode("utf-8"), digest_size=8).hexdigest()
+    return Path(base) / CACHE_DIR_NAME / f"brief.{key}.json"
+
+
+def parse_task_brief(desc_limit: int = 200) -> dict:
+    """
+    Parse the task brief to extract metadata (cached by content hash).
+    
+    The description is truncated to ``desc_limit`` characters here, so the
+    commit message can use it as-is.
+    """
     if not LATEST_BRIEF.exists():
         return {}
     
-    content = LATEST_BRIEF.read_text(encoding="utf-8")
-    metadata = {}
-    
-    for line in content.splitlines():
-        if line.startswith("- Title:"):
-            metadata["title"] = line.split(":", 1)[1].strip()
-        elif line.startswith("- Type:"):
-            metadata["type"] = line.split(":", 1)[1].strip()
-        elif line.startswith("- Branch:"):
-            metadata["branch"] = line.split(":", 1)[1].strip()
+    data = LATEST_BRIEF.read_bytes()
+    digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+    cache_path = _brief_cache_path()
+    try:
+        cached = json.loads(cache_path.read_text(encoding="utf-8"))
+        if cached["hash"] == digest and cached.get("limit") == desc_limit:
+            return cached["meta"]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    
+    content = data.decode("utf-8")
+    metadata = {
+        key.lower(): value.strip() for key, value in BRIEF_META_RE.findall(content)
+    }
     
     # Extract description
-    if "## Description" in content:
-        desc_start = content.index("## Description") + len("## Description")
-        desc_end = content.find("##", desc_start)
-        if desc_end == -1:
-            desc_end = len(content)
-        metadata["description"] = content[desc_start:desc_end].strip()
+    match = BRIEF_DESC_RE.search(content)
+    if match:
+        description = match.group(1).strip()
+        if len(description) > desc_limit:
+            description = description[:desc_limit - 3] + "..."
+        metadata["description"] = description
+    
+    # Best effort: the cache lives outside the project, so it never shows
+    # up as a change in the task-brief checks
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(".tmp")
+        tmp_path.write_text(
+            json.dumps(
+                {"hash": digest, "limit": desc_limit, "meta": metadata},
+                ensure_ascii=False,
+            ),
+            encoding="utf-8"
+        )
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
     
     return metadata
 
 
+def load_script(path: Path) -> Optional[ModuleType]:
+    """Import a sibling script (hyphenated file name) in-process, or None on failure."""
+    spec = importlib.util.spec_from_file_location(path.stem.replace("-", "_"), path)
+    if spec is None or spec.loader is None:
+        return None
+    module = importlib.util.module_from_spec(spec)
+    try:
+        spec.loader.exec_module(module)
+    except Exception:
+        return None
+    return module
+
+
 def run_validation() -> bool:
     """Run validation script if available."""
     validate_script = ROOT / "scripts" / "validate-context.py"
@@ -117,17 +302,30 @@ def run_validation() -> bool:
         return True
     
     print(colorize("Running validation...", Colors.GRAY))
-    result = subprocess.run(
-        ["python3", str(validate_script)],
-        cwd=ROOT,
-        capture_output=True,
-        text=True,
-    )
     
-    if result.returncode != 0:
+    # Call the script's main() in-process to skip a Python interpreter startup
+    module = load_script(validate_script)
+    if module is not None:
+        output = io.StringIO()
+        with redirect_stdout(output), redirect_stderr(output):
+            try:
+                returncode = module.main()
+            except SystemExit as exc:
+                returncode = exc.code if isinstance(exc.code, int) else 1
+        stdout, stderr = output.getvalue(), ""
+    else:
+        result = subprocess.run(
+            ["python3", str(validate_script)],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+        )
+        returncode, stdout, stderr = result.returncode, result.stdout, result.stderr
+    
+    if returncode != 0:
         print(colorize("❌ Validation failed:", Colors.RED))
-        print(result.stdout)
-        print(result.stderr)
+        print(stdout)
+        print(stderr)
         return False
     
     print(colorize("✅ Validation passed", Colors.GREEN))
@@ -135,7 +333,12 @@ def run_validation() -> bool:
 
 
 def archive_task_brief(by_branch: bool = False, by_title: bool = False) -> bool:
-    """Archive the current task brief."""
+    """
+    Archive the current task brief.
+    
+    ``by_branch``/``by_title`` select the archive folders; with neither set
+    the archive script's default layout (branch and title) is used.
+    """
     archive_script = ROOT / "scripts" / "archive-task-brief.py"
     
     if not archive_script.exists():
@@ -147,17 +350,35 @@ def archive_task_brief(by_branch: bool = False, by_title: bool = False) -> bool:
         timestamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
         archive_path = ARCHIVE_DIR / f"task_{timestamp}.md"
         
-        import shutil
-        shutil.copy(LATEST_BRIEF, archive_path)
-        LATEST_BRIEF.unlink()
+        try:
+            # Same directory tree, so a rename moves it without copying data
+            os.replace(LATEST_BRIEF, archive_path)
+        except OSError:
+            # e.g. EXDEV when archive/ is a mount or symlink to another device
+            import shutil
+            shutil.copy(LATEST_BRIEF, archive_path)
+            LATEST_BRIEF.unlink()
         print(colorize(f"✅ Archived to: {archive_path}", Colors.GREEN))
         return True
     
+    if not (by_branch or by_title):
+        by_branch = by_title = True
+    
+    module = load_script(archive_script)
+    if module is not None:
+        try:
+            module.archive_latest(by_branch, by_title)
+        except (OSError, ValueError) as exc:
+            print(colorize(f"⚠️  Archive warning: {exc}", Colors.YELLOW))
+            return True  # Non-fatal
+        print(colorize("✅ Task brief archived", Colors.GREEN))
+        return True
+    
     args = ["python3", str(archive_script)]
-    if by_branch:
-        args.append("--by-branch")
-    if by_title:
-        args.append("--by-title")
+    if not by_branch:
+        args.append("--no-branch")
+    if not by_title:
+        args.append("--no-title")
     
     result = subprocess.run(args, cwd=ROOT, capture_output=True, text=True)
     
@@ -169,8 +390,19 @@ def archive_task_brief(by_branch: bool = False, by_title: bool = False) -> bool:
         return True  # Non-fatal
 
 
-def generate_commit_message(metadata: dict, files: List[str]) -> str:
-    """Generate a commit message based on task brief."""
+def generate_commit_message(
+    metadata: dict,
+    files: List[str],
+    total: Optional[int] = None
+) -> str:
+    """
+    Generate a commit message based on task brief.
+    
+    Only the first 10 of ``files`` are listed; ``total`` is the full count
+    when ``files`` was already truncated.
+    """
+    if total is None:
+        total = len(files)
     task_type = metadata.get("type", "chore")
     title = metadata.get("title", "Complete task")
     description = metadata.get("description", "")
@@ -189,30 +421,38 @@ def generate_commit_message(metadata: dict, files: List[str]) -> str:
     message = f"{commit_type}: {title}"
     
     if description:
-        # Truncate description if too long
-        if len(description) > 200:
-            description = description[:197] + "..."
         message += f"\n\n{description}"
     
     if files:
-        message += f"\n\nFiles changed ({len(files)}):"
+        message += f"\n\nFiles changed ({total}):"
         for f in files[:10]:
             message += f"\n- {f}"
-        if len(files) > 10:
-            message += f"\n... and {len(files) - 10} more"
+        if total > 10:
+            message += f"\n... and {total - 10} more"
     
     return message
 
 
-def create_commit(message: str) -> bool:
-    """Create a git commit with the given message."""
-    # Stage all changes
+def stage_changes() -> Optional[List[str]]:
+    """
+    Stage all changes and return the staged paths (None if staging failed).
+    
+    ``git add -A`` already walks the working tree, so the file list is read
+    back from the index instead of walking it again beforehand.
+    """
     code, _, stderr = run_git(["add", "-A"])
     if code != 0:
         print(colorize(f"❌ Failed to stage changes: {stderr}", Colors.RED))
-        return False
+        return None
     
-    # Commit
+    code, stdout = run_git_raw(["diff", "--cached", "--name-only", "-z"])
+    if code != 0:
+        return []
+    return [os.fsdecode(path) for path in stdout.split(b"\0")[:-1]]
+
+
+def create_commit(message: str) -> bool:
+    """Create a git commit with the given message (changes must be staged)."""
     code, stdout, stderr = run_git(["commit", "-m", message])
     if code != 0:
         if "nothing to commit" in stdout or "nothing to commit" in stderr:
@@ -227,7 +467,7 @@ def create_commit(message: str) -> bool:
 
 def print_summary(
     metadata: dict,
-    files: List[str],
+    files_count: int,
     archived: bool,
     committed: bool
 ) -> None:
@@ -238,7 +478,7 @@ def print_summary(
     
     print(f"\n{colorize('Title:', Colors.CYAN)} {metadata.get('title', 'Unknown')}")
     print(f"{colorize('Type:', Colors.CYAN)} {metadata.get('type', 'Unknown')}")
-    print(f"{colorize('Files changed:', Colors.CYAN)} {len(files)}")
+    print(f"{colorize('Files changed:', Colors.CYAN)} {files_count}")
     print(f"{colorize('Archived:', Colors.CYAN)} {'Yes' if archived else 'No'}")
     print(f"{colorize('Committed:', Colors.CYAN)} {'Yes' if committed else 'No'}")
     
@@ -270,12 +510,12 @@ def main() -> int:
     parser.add_argument(
         "--by-branch",
         action="store_true",
-        help="Archive using branch name in filename"
+        help="Archive under a branch folder only (default: branch and title folders)"
     )
     parser.add_argument(
         "--by-title",
         action="store_true",
-        help="Archive using task title in filename"
+        help="Archive under a title folder only (default: branch and title folders)"
     )
     parser.add_argument(
         "--message", "-m",
@@ -311,11 +551,11 @@ def main() -> int:
     if not args.quiet:
         print(colorize(f"Task: {metadata.get('title', 'Unknown')}", Colors.CYAN))
     
-    # Get changed files
-    files = get_changed_files()
+    # Count changed files; the list itself is only needed for the commit message
+    files_count = count_changed_files()
     
     if not args.quiet:
-        print(colorize(f"Changed files: {len(files)}", Colors.GRAY))
+        print(colorize(f"Changed files: {files_count}", Colors.GRAY))
     
     # Run validation
     if not args.no_validate:
@@ -332,7 +572,9 @@ def main() -> int:
             print(f"Would archive: {LATEST_BRIEF}")
         
         if args.commit:
-            message = args.message or generate_commit_message(metadata, files)
+            message = args.message or generate_commit_message(
+                metadata, get_changed_files(limit=10), files_count
+            )
             print(f"Would commit with message:\n{message}")
         
         return 0
@@ -345,19 +587,21 @@ def main() -> int:
     # Create commit if requested
     committed = False
     if args.commit:
-        message = args.message or generate_commit_message(metadata, files)
-        
-        if not args.quiet:
-            print(colorize("\nCommit message:", Colors.CYAN))
-            print(colorize("─" * 40, Colors.GRAY))
-            print(message)
-            print(colorize("─" * 40, Colors.GRAY))
-        
-        committed = create_commit(message)
+        staged = stage_changes()
+        if staged is not None:
+            message = args.message or generate_commit_message(metadata, staged)
+            
+            if not args.quiet:
+                print(colorize("\nCommit message:", Colors.CYAN))
+                print(colorize("─" * 40, Colors.GRAY))
+                print(message)
+                print(colorize("─" * 40, Colors.GRAY))
+            
+            committed = create_commit(message)
     
     # Print summary
     if not args.quiet:
-        print_summary(metadata, files, archived, committed)
+        print_summary(metadata, files_count, archived, committed)
     
     if not args.quiet:
         print(colorize("\n✅ Task completed successfully!", Colors.GREEN))
@@ -2,8 +2,13 @@
 from __future__ import annotations
 
 import argparse
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
+from typing import Iterable
 
 ROOT = Path(__file__).resolve().parents[1]
 DEFAULT_IGNORE = {
@@ -41,6 +46,15 @@ KEY_FILES = [
 ]
 CONTRACT_DIRS = ["contracts", "openapi", "proto"]
 DATA_DIRS = ["migrations", "schema", "db", "database", "data"]
+UI_NAMES = frozenset({"ui", "frontend", "web"})
+DOCS_NAMES = frozenset({"docs", "doc"})
+SCRIPTS_NAMES = frozenset({"scripts", "tools"})
+CONTRACTS_NAMES = frozenset(CONTRACT_DIRS)
+# Directories whose listings decide the module entry (nested candidates live under src/)
+FINGERPRINT_DIRS = ["", "src", "src/main"]
+CACHE_DIR_NAME = "ai-context-toolkit"
+CACHE_VERSION = 1
+CACHE_MAX_ENTRIES = 4096
 
 
 def utc_now() -> str:
@@ -49,108 +63,199 @@ def utc_now() -> str:
 
 def list_dirs(root: Path, ignore: set[str]) -> list[Path]:
     dirs = []
-    for child in root.iterdir():
-        if not child.is_dir():
-            continue
-        if child.name.startswith("."):
-            continue
-        if child.name in ignore:
-            continue
-        dirs.append(child)
+    with os.scandir(root) as it:
+        for entry in it:
+            if entry.name.startswith("."):
+                continue
+            if entry.name in ignore:
+                continue
+            # Answered from the readdir type; only symlinks need a stat
+            if not entry.is_dir():
+                continue
+            dirs.append(Path(entry.path))
     return sorted(dirs, key=lambda p: p.name.lower())
 
 
-def detect_tags(module: Path) -> list[str]:
+def dir_entries(module: Path) -> set[str]:
+    # One directory listing replaces an exists() call per candidate
+    try:
+        with os.scandir(module) as it:
+            return {entry.name for entry in it}
+    except OSError:
+        return set()
+
+
+def has_path(module: Path, rel: str, entries: set[str]) -> bool:
+    top, sep, _ = rel.partition("/")
+    if top not in entries:
+        return False
+    # Nested candidates (e.g. src/main/java) only stat when the top dir exists
+    return not sep or (module / rel).exists()
+
+
+def detect_tags(module: Path, entries: set[str]) -> list[str]:
     tags: list[str] = []
     name = module.name.lower()
-    if (module / "package.json").exists() or name in {"ui", "frontend", "web"}:
+    if "package.json" in entries or name in UI_NAMES:
         tags.append("Frontend UI")
-    if (module / "build.gradle").exists() or (module / "pom.xml").exists():
+    if "build.gradle" in entries or "pom.xml" in entries:
         tags.append("Java module")
-    if (module / "go.mod").exists():
+    if "go.mod" in entries:
         tags.append("Go service")
-    if (module / "Cargo.toml").exists():
+    if "Cargo.toml" in entries:
         tags.append("Rust crate")
-    if name in {"docs", "doc"}:
+    if name in DOCS_NAMES:
         tags.append("Docs")
-    if name in {"scripts", "tools"}:
+    if name in SCRIPTS_NAMES:
         tags.append("Scripts/Automation")
-    if name in {"contracts", "openapi", "proto"}:
+    if name in CONTRACTS_NAMES:
         tags.append("Contracts")
     if not tags:
         tags.append("Module")
     return tags
 
 
-def existing_paths(module: Path, candidates: list[str]) -> list[str]:
-    results: list[str] = []
-    for rel in candidates:
-        path = module / rel
-        if path.exists():
-            results.append(rel)
-    return results
+def existing_paths(module: Path, candidates: list[str], entries: set[str]) -> list[str]:
+    return [rel for rel in candidates if has_path(module, rel, entries)]
+
 
+def detect_contracts(module: Path, entries: set[str]) -> list[str]:
+    return existing_paths(module, CONTRACT_DIRS, entries)
 
-def detect_contracts(module: Path) -> list[str]:
-    found: list[str] = []
-    for rel in CONTRACT_DIRS:
-        path = module / rel
-        if path.exists():
-            found.append(rel)
-    return found
 
+def detect_data(module: Path, entries: set[str]) -> list[str]:
+    return existing_paths(module, DATA_DIRS, entries)
 
-def detect_data(module: Path) -> list[str]:
-    found: list[str] = []
-    for rel in DATA_DIRS:
-        path = module / rel
-        if path.exists():
-            found.append(rel)
-    return found
+
+@dataclass
+class ModuleInfo:
+    name: str
+    tags: list[str]
+    entries: list[str]
+    keys: list[str]
+    contracts: list[str]
+    data: list[str]
+
+
+def scan_module(module: Path) -> ModuleInfo:
+    # All filesystem access for a module; rendering only formats the result
+    entries = dir_entries(module)
+    return ModuleInfo(
+        name=module.name,
+        tags=detect_tags(module, entries),
+        entries=existing_paths(module, ENTRY_CANDIDATES, entries),
+        keys=existing_paths(module, KEY_FILES, entries),
+        contracts=detect_contracts(module, entries),
+        data=detect_data(module, entries),
+    )
 
 
-def render_module_en(module: Path) -> str:
-    tags = ", ".join(detect_tags(module))
-    entries = existing_paths(module, ENTRY_CANDIDATES)
-    keys = existing_paths(module, KEY_FILES)
-    contracts = detect_contracts(module)
-    data = detect_data(module)
+def scan_modules(modules: list[Path]) -> list[ModuleInfo]:
+    # Detection is stat()-bound and syscalls release the GIL, so threads overlap it
+    if len(modules) < 2:
+        return [scan_module(module) for module in modules]
+    workers = min(32, (os.cpu_count() or 1) * 4, len(modules))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(scan_module, modules))
+
+
+def render_module_en(info: ModuleInfo) -> str:
     return "\n".join(
         [
-            f"### {module.name}",
-            f"- Purpose: {tags}.",
-            f"- Entrypoints: {', '.join(entries) if entries else 'N/A'}",
-            f"- Key files: {', '.join(keys) if keys else 'N/A'}",
+            f"### {info.name}",
+            f"- Purpose: {', '.join(info.tags)}.",
+            f"- Entrypoints: {', '.join(info.entries) if info.entries else 'N/A'}",
+            f"- Key files: {', '.join(info.keys) if info.keys else 'N/A'}",
             f"- Dependencies: TBD",
-            f"- Contracts: {', '.join(contracts) if contracts else 'N/A'}",
-            f"- Data: {', '.join(data) if data else 'N/A'}",
+            f"- Contracts: {', '.join(info.contracts) if info.contracts else 'N/A'}",
+            f"- Data: {', '.join(info.data) if info.data else 'N/A'}",
             f"- Notes: Generated; refine as needed.",
             "",
         ]
     )
 
 
-def render_module_zh(module: Path) -> str:
-    tags = "、".join(detect_tags(module))
-    entries = existing_paths(module, ENTRY_CANDIDATES)
-    keys = existing_paths(module, KEY_FILES)
-    contracts = detect_contracts(module)
-    data = detect_data(module)
+def render_module_zh(info: ModuleInfo) -> str:
     return "\n".join(
         [
-            f"### {module.name}",
-            f"- 作用：{tags}。",
-            f"- 入口：{('、'.join(entries)) if entries else '无'}",
-            f"- 关键文件：{('、'.join(keys)) if keys else '无'}",
+            f"### {info.name}",
+            f"- 作用：{'、'.join(info.tags)}。",
+            f"- 入口：{('、'.join(info.entries)) if info.entries else '无'}",
+            f"- 关键文件：{('、'.join(info.keys)) if info.keys else '无'}",
             f"- 依赖：待补充",
-            f"- 契约：{('、'.join(contracts)) if contracts else '无'}",
-            f"- 数据：{('、'.join(data)) if data else '无'}",
+            f"- 契约：{('、'.join(info.contracts)) if info.contracts else '无'}",
+            f"- 数据：{('、'.join(info.data)) if info.data else '无'}",
             f"- 备注：自动生成，需人工完善。",
             "",
         ]
     )
 
 
+def cache_path() -> Path:
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / CACHE_DIR_NAME / "module-map.json"
+
+
+def load_cache() -> dict[str, dict[str, str]]:
+    try:
+        data = json.loads(cache_path().read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != CACHE_VERSION:
+        return {}
+    return data.get("modules", {})
+
+
+def save_cache(modules: dict[str, dict[str, str]]) -> None:
+    # Oldest entries first (insertion order), so trimming keeps the most recent
+    if len(modules) > CACHE_MAX_ENTRIES:
+        modules = dict(list(modules.items())[-CACHE_MAX_ENTRIES:])
+    path = cache_path()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(
+            json.dumps({"version": CACHE_VERSION, "modules": modules}, ensure_ascii=False),
+            encoding="utf-8",
+        )
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+def fingerprint(module: Path) -> str:
+    # Directory mtimes change whenever an entry is added, removed or renamed
+    stamps = []
+    for rel in FINGERPRINT_DIRS:
+        try:
+            stamps.append(str((module / rel).stat().st_mtime_ns))
+        except OSError:
+            stamps.append("-")
+    return f"{module}:{':'.join(stamps)}"
+
+
+def render_modules(modules: list[Path], use_cache: bool) -> list[dict[str, str]]:
+    # Rendered EN/ZH blocks per module; unchanged modules come from the cache
+    cache = load_cache() if use_cache else {}
+    keys = [fingerprint(module) for module in modules]
+    misses = [module for module, key in zip(modules, keys) if key not in cache]
+    scanned = iter(scan_modules(misses))
+
+    blocks = []
+    for key in keys:
+        entry = cache.pop(key, None)
+        if entry is None:
+            info = next(scanned)
+            entry = {"en": render_module_en(info), "zh": render_module_zh(info)}
+        # Re-insert so recently used entries survive trimming
+        cache[key] = entry
+        blocks.append(entry)
+
+    if use_cache:
+        save_cache(cache)
+    return blocks
+
+
 def render_header_en(project_root: Path) -> str:
     return "\n".join(
         [
@@ -179,9 +284,15 @@ def render_header_zh(project_root: Path) -> str:
     )
 
 
-def write_output(path: Path, content: str) -> None:
+def write_output(path: Path, header: str, blocks: Iterable[str]) -> None:
+    # Stream blocks to the file instead of joining one large string
     path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(content.rstrip() + "\n", encoding="utf-8")
+    with open(path, "w", encoding="utf-8", buffering=1 << 20) as fh:
+        fh.write(header.rstrip())
+        for block in blocks:
+            fh.write("\n\n")
+            fh.write(block.rstrip())
+        fh.write("\n")
 
 
 def main() -> int:
@@ -207,6 +318,7 @@ def main() -> int:
         help="comma-separated folder names to ignore",
     )
     parser.add_argument("--no-root", action="store_true", help="exclude root module entry")
+    parser.add_argument("--no-cache", action="store_true", help="rescan every module")
     args = parser.parse_args()
 
     project_root = Path(args.project_root).resolve()
@@ -218,19 +330,20 @@ def main() -> int:
     if not modules:
         modules = []
 
-    content_en = [render_header_en(project_root)]
-    content_zh = [render_header_zh(project_root)]
-
     if not args.no_root:
-        content_en.append(render_module_en(project_root))
-        content_zh.append(render_module_zh(project_root))
-
-    for module in modules:
-        content_en.append(render_module_en(module))
-        content_zh.append(render_module_zh(module))
+        modules.insert(0, project_root)
+    blocks = render_modules(modules, use_cache=not args.no_cache)
 
-    write_output(Path(args.output), "\n".join(content_en))
-    write_output(Path(args.output_zh), "\n".join(content_zh))
+    write_output(
+        Path(args.output),
+        render_header_en(project_root),
+        (block["en"] for block in blocks),
+    )
+    write_output(
+        Path(args.output_zh),
+        render_header_zh(project_root),
+        (block["zh"] for block in blocks),
+    )
     print(f"Generated module maps: {args.output}, {args.output_zh}")
     return 0
 
@@ -19,13 +19,32 @@ from __future__ import annotations
 
 import argparse
 import json
+import string
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional, List
 
+try:
+    import yaml
+    HAS_YAML = True
+    # libyaml's C emitter when PyYAML was built with it
+    YAML_DUMPER = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+except ImportError:
+    HAS_YAML = False
+
+# Optional C-accelerated JSON encoder
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 # Add script directory to path
 SCRIPT_DIR = Path(__file__).resolve().parent
-sys.path.insert(0, str(SCRIPT_DIR))
+# Already sys.path[0] when run as a script; only needed when loaded from elsewhere
+if str(SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR))
 
 from core.env_detector import EnvDetector, EnvironmentInfo
 from core.agent_registry import AgentRegistry, AgentInfo
@@ -43,13 +62,32 @@ class Colors:
     GRAY = "\033[90m"
 
 
+# Checked once instead of on every colorize() call
+USE_COLOR = sys.stdout.isatty()
+
+
 def colorize(text: str, color: str) -> str:
     """Apply color if terminal supports it."""
-    if sys.stdout.isatty():
+    if USE_COLOR:
         return f"{color}{text}{Colors.RESET}"
     return text
 
 
+class Styled:
+    """Colored strings that never change, formatted once at import."""
+    SECTION_TOP = colorize(f"\n{'─'*60}", Colors.GRAY)
+    SECTION_BOTTOM = colorize(f"{'─'*60}", Colors.GRAY)
+    SYSTEM = colorize("System:", Colors.CYAN)
+    LANGUAGES = colorize("Languages:", Colors.CYAN)
+    PROJECT = colorize("Project:", Colors.CYAN)
+    GIT = colorize("Git:", Colors.CYAN)
+    UNCOMMITTED = colorize("⚠️  Uncommitted changes detected", Colors.YELLOW)
+    CONFIGURED = colorize("Available and configured:", Colors.GREEN)
+    NO_AGENTS = colorize("No agents available", Colors.YELLOW)
+    NEEDS_CONFIG = colorize("Installed but not configured:", Colors.YELLOW)
+    NOT_INSTALLED = colorize("Not installed:", Colors.GRAY)
+
+
 def print_banner() -> None:
     """Print welcome banner."""
     banner = """
@@ -64,39 +102,42 @@ def print_banner() -> None:
 
 def print_section(title: str) -> None:
     """Print a section header."""
-    print(colorize(f"\n{'─'*60}", Colors.GRAY))
+    print(Styled.SECTION_TOP)
     print(colorize(f"  {title}", Colors.BOLD))
-    print(colorize(f"{'─'*60}", Colors.GRAY))
+    print(Styled.SECTION_BOTTOM)
 
 
 def print_env_summary(env: EnvironmentInfo) -> None:
     """Print environment detection summary."""
     print_section("Environment Detection")
     
-    print(f"\n{colorize('System:', Colors.CYAN)}")
+    print(f"\n{Styled.SYSTEM}")
     print(f"  OS: {env.os_type} ({env.architecture})")
     print(f"  Shell: {env.shell}")
     
-    print(f"\n{colorize('Languages:', Colors.CYAN)}")
-    for lang in [env.python, env.node, env.java, env.go, env.rust]:
-        if lang and lang.available:
-            print(f"  ✅ {lang.name}: {lang.version or 'unknown'}")
-        elif lang:
-            print(f"  ❌ {lang.name}: not installed")
-    
-    print(f"\n{colorize('Project:', Colors.CYAN)}")
+    print(f"\n{Styled.LANGUAGES}")
+    rows = [
+        f"  ✅ {lang.name}: {lang.version or 'unknown'}" if lang.available
+        else f"  ❌ {lang.name}: not installed"
+        for lang in (env.python, env.node, env.java, env.go, env.rust)
+        if lang
+    ]
+    if rows:
+        sys.stdout.write("\n".join(rows) + "\n")
+    
+    print(f"\n{Styled.PROJECT}")
     print(f"  Type: {env.project_type}")
     if env.frameworks:
         print(f"  Frameworks: {', '.join(env.frameworks)}")
     
     if env.git and env.git.available:
         git_info = env.git.details
-        print(f"\n{colorize('Git:', Colors.CYAN)}")
+        print(f"\n{Styled.GIT}")
         if git_info.get("is_repo"):
             print(f"  Repository: ✅")
             print(f"  Branch: {git_info.get('branch', 'unknown')}")
             if git_info.get("has_uncommitted_changes"):
-                print(f"  {colorize('⚠️  Uncommitted changes detected', Colors.YELLOW)}")
+                print(f"  {Styled.UNCOMMITTED}")
         else:
             print(f"  Repository: ❌ (not a git repo)")
 
@@ -105,25 +146,33 @@ def print_agents_summary(agents: List[AgentInfo]) -> None:
     """Print AI agents summary."""
     print_section("AI Agents Detection")
     
-    available = [a for a in agents if a.available and a.api_key_configured]
+    # One pass over the agents, partitioned by status
+    available: List[AgentInfo] = []
+    needs_config: List[AgentInfo] = []
+    not_installed: List[AgentInfo] = []
+    for agent in agents:
+        if not agent.available:
+            not_installed.append(agent)
+        elif agent.api_key_configured:
+            available.append(agent)
+        else:
+            needs_config.append(agent)
     
-    print(f"\n{colorize('Available and configured:', Colors.GREEN)}")
+    print(f"\n{Styled.CONFIGURED}")
     if available:
         for agent in available:
             print(f"  ✅ {agent.name} (v{agent.version or 'unknown'})")
     else:
-        print(f"  {colorize('No agents available', Colors.YELLOW)}")
+        print(f"  {Styled.NO_AGENTS}")
     
-    print(f"\n{colorize('Installed but not configured:', Colors.YELLOW)}")
-    needs_config = [a for a in agents if a.available and not a.api_key_configured]
+    print(f"\n{Styled.NEEDS_CONFIG}")
     if needs_config:
         for agent in needs_config:
             print(f"  ⚠️  {agent.name} - needs API key")
     else:
         print(f"  None")
     
-    print(f"\n{colorize('Not installed:', Colors.GRAY)}")
-    not_installed = [a for a in agents if not a.available]
+    print(f"\n{Styled.NOT_INSTALLED}")
     if not_installed:
         for agent in not_installed[:5]:
             print(f"  ❌ {agent.name}")
@@ -197,14 +246,12 @@ def generate_cursorrules(project_root: Path, env: EnvironmentInfo) -> None:
     print(f"  ✅ Generated: .cursorrules")
 
 
-def generate_claude_context(project_root: Path, env: EnvironmentInfo, agent: Optional[str]) -> None:
-    """Generate CLAUDE.md for Claude Code / Project context."""
-    content = f"""# Project Context for AI Assistants
+CLAUDE_TEMPLATE = string.Template("""# Project Context for AI Assistants
 
 ## Project Overview
-- **Type**: {env.project_type}
-- **Frameworks**: {', '.join(env.frameworks) if env.frameworks else 'None detected'}
-- **Root**: {project_root}
+- **Type**: ${project_type}
+- **Frameworks**: ${frameworks}
+- **Root**: ${root}
 
 ## Development Rules
 Follow the rules in `ai-context/`:
@@ -213,7 +260,7 @@ Follow the rules in `ai-context/`:
 - `backend.md` - Backend conventions
 
 ## AI Agent
-- **Preferred**: {agent or 'Auto-selected'}
+- **Preferred**: ${agent}
 
 ## Quick Commands
 
@@ -236,24 +283,47 @@ python3 ai-context/scripts/finish-task.py
 2. Make changes with AI assistance
 3. Verify: `python3 scripts/validate-context.py`
 4. Archive: `python3 scripts/archive-task-brief.py`
-"""
+""")
+
+
+def generate_claude_context(project_root: Path, env: EnvironmentInfo, agent: Optional[str]) -> None:
+    """Generate CLAUDE.md for Claude Code / Project context."""
+    content = CLAUDE_TEMPLATE.substitute(
+        project_type=env.project_type,
+        frameworks=", ".join(env.frameworks) if env.frameworks else "None detected",
+        root=project_root,
+        agent=agent or "Auto-selected",
+    )
     
     claude_path = project_root / "CLAUDE.md"
     claude_path.write_text(content, encoding="utf-8")
     print(f"  ✅ Generated: CLAUDE.md")
 
 
+def json_bytes(data: dict) -> bytes:
+    """Serialize to indented UTF-8 JSON (non-ASCII kept as-is)."""
+    if HAS_ORJSON:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+def write_config_file(config_dir: Path, name: str, data: dict) -> None:
+    """Write a config file as YAML, or as JSON when PyYAML is missing."""
+    if HAS_YAML:
+        filename = f"{name}.yaml"
+        with open(config_dir / filename, "w", encoding="utf-8") as fh:
+            yaml.dump(data, fh, Dumper=YAML_DUMPER, default_flow_style=False, allow_unicode=True)
+    else:
+        filename = f"{name}.json"
+        (config_dir / filename).write_bytes(json_bytes(data))
+    print(f"  ✅ Generated: config/{filename}")
+
+
 def generate_config_files(project_root: Path, agent: Optional[str]) -> None:
     """Generate configuration files."""
     config_dir = project_root / "ai-context" / "config"
-    config_dir.mkdir(parents=True, exist_ok=True)
-    
-    # Try to import yaml, fall back to json
-    try:
-        import yaml
-        HAS_YAML = True
-    except ImportError:
-        HAS_YAML = False
+    # No parents: a missing ai-context/ raises FileNotFoundError (see setup_project)
+    config_dir.mkdir(exist_ok=True)
     
     # agents config
     agents_config = {
@@ -276,20 +346,7 @@ def generate_config_files(project_root: Path, agent: Optional[str]) -> None:
         },
     }
     
-    if HAS_YAML:
-        agents_path = config_dir / "agents.yaml"
-        agents_path.write_text(
-            yaml.dump(agents_config, default_flow_style=False, allow_unicode=True),
-            encoding="utf-8"
-        )
-        print(f"  ✅ Generated: config/agents.yaml")
-    else:
-        agents_path = config_dir / "agents.json"
-        agents_path.write_text(
-            json.dumps(agents_config, indent=2, ensure_ascii=False),
-            encoding="utf-8"
-        )
-        print(f"  ✅ Generated: config/agents.json")
+    write_config_file(config_dir, "agents", agents_config)
     
     # environments config
     env_config = {
@@ -303,25 +360,12 @@ def generate_config_files(project_root: Path, agent: Optional[str]) -> None:
         },
     }
     
-    if HAS_YAML:
-        env_path = config_dir / "environments.yaml"
-        env_path.write_text(
-            yaml.dump(env_config, default_flow_style=False, allow_unicode=True),
-            encoding="utf-8"
-        )
-        print(f"  ✅ Generated: config/environments.yaml")
-    else:
-        env_path = config_dir / "environments.json"
-        env_path.write_text(
-            json.dumps(env_config, indent=2, ensure_ascii=False),
-            encoding="utf-8"
-        )
-        print(f"  ✅ Generated: config/environments.json")
+    write_config_file(config_dir, "environments", env_config)
 
 
 def setup_project(
     project_root: Path,
-    env: EnvironmentInfo,
+    env: Optional[EnvironmentInfo],
     agent: Optional[str],
     skip_generation: bool = False
 ) -> bool:
@@ -333,17 +377,18 @@ def setup_project(
         return True
     
     try:
-        # Ensure ai-context directory exists
-        ai_context_dir = project_root / "ai-context"
-        if not ai_context_dir.exists():
+        # Generate configuration files; creating config/ doubles as the
+        # check that the ai-context directory exists
+        try:
+            generate_config_files(project_root, agent)
+        except FileNotFoundError:
+            if (project_root / "ai-context").exists():
+                raise
             print(colorize(f"  ⚠️  ai-context directory not found at {project_root}", Colors.YELLOW))
             print("  This script should be run from the ai-context project root")
             print("  or the ai-context toolkit should be copied to your project.")
             return False
         
-        # Generate configuration files
-        generate_config_files(project_root, agent)
-        
         # Generate IDE integration files
         generate_cursorrules(project_root, env)
         generate_claude_context(project_root, env, agent)
@@ -421,8 +466,16 @@ def main() -> int:
         action="store_true",
         help="Minimal output"
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Ignore cached environment detection results"
+    )
     
     args = parser.parse_args()
+    # JSON goes to stdout for other tools; nothing else may be printed
+    if args.json:
+        args.quiet = True
     
     # Determine project root
     if args.project_root:
@@ -436,23 +489,36 @@ def main() -> int:
     if not args.quiet:
         print_banner()
     
-    # Detect environment
-    detector = EnvDetector(project_root)
-    env = detector.detect_all()
+    # Detect environment (only read by the summary, --json and file generation)
+    detect_env = args.json or not args.quiet or not args.no_generate
+    # Building the registry probes every agent; skip it when --agent already
+    # decides and no summary is printed. Quiet auto-selection only probes
+    # until the first usable agent (see below).
+    probe_agents = not args.json and (not args.quiet or args.interactive)
+    
+    # Both are independent subprocess probes, so they run side by side
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        env_future = None
+        if detect_env:
+            detector = EnvDetector(project_root)
+            env_future = pool.submit(detector.detect_all, use_cache=not args.no_cache)
+        registry_future = pool.submit(AgentRegistry, project_root) if probe_agents else None
+        env = env_future.result() if env_future else None
+        registry = registry_future.result() if registry_future else None
     
     if args.json:
-        print(json.dumps(env.to_dict(), indent=2))
+        sys.stdout.flush()
+        sys.stdout.buffer.write(json_bytes(env.to_dict()) + b"\n")
         return 0
     
     if not args.quiet:
         print_env_summary(env)
     
-    # Initialize agent registry
-    registry = AgentRegistry(project_root)
-    agents = registry.get_all_agents()
+    if registry is None and not args.agent:
+        registry = AgentRegistry(project_root, probe=False)
     
     if not args.quiet:
-        print_agents_summary(agents)
+        print_agents_summary(registry.get_all_agents())
     
     # Determine which agent to use
     selected_agent = None
@@ -465,7 +531,7 @@ def main() -> int:
         selected_agent = interactive_agent_selection(registry)
     else:
         # Auto-select best available
-        recommended = registry.get_recommended_agent()
+        recommended = registry.get_recommended_agent_fast()
         if recommended:
             selected_agent = recommended.name.lower().replace(" ", "-")
     
@@ -13,14 +13,17 @@ Usage:
 
 from __future__ import annotations
 
-import argparse
+import re
 import sys
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional, List
 
 # Add parent directory to path for imports
 SCRIPT_DIR = Path(__file__).resolve().parent
-sys.path.insert(0, str(SCRIPT_DIR))
+# Already sys.path[0] when run as a script; only needed when loaded from elsewhere
+if str(SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR))
 
 from core.rollback_manager import RollbackManager, Snapshot, DiffResult
 
@@ -37,80 +40,116 @@ class Colors:
     GRAY = "\033[90m"
 
 
+# Checked once instead of on every colorize() call
+USE_COLOR = sys.stdout.isatty()
+
+
 def colorize(text: str, color: str) -> str:
     """Apply color to text if terminal supports it."""
-    if sys.stdout.isatty():
+    if USE_COLOR:
         return f"{color}{text}{Colors.RESET}"
     return text
 
 
+# Diff line prefix -> color; "+++"/"---" file headers match first and stay plain
+DIFF_LINE_RE = re.compile(r"\+\+\+|---|@@|\+|-")
+DIFF_LINE_COLORS = {"+": Colors.GREEN, "-": Colors.RED, "@@": Colors.CYAN}
+
+
+class Styled:
+    """Colored strings that never change, formatted once at import."""
+    HEADER_TOP = colorize(f"\n{'='*60}", Colors.CYAN)
+    HEADER_BOTTOM = colorize(f"{'='*60}\n", Colors.CYAN)
+    CREATED = colorize("Created:", Colors.GRAY)
+    TASK = colorize("Task:", Colors.GRAY)
+    AGENT = colorize("Agent:", Colors.GRAY)
+    MODE = colorize("Mode:", Colors.GRAY)
+    FILES = colorize("Files:", Colors.GRAY)
+
+
 def print_header(text: str) -> None:
     """Print a formatted header."""
-    print(colorize(f"\n{'='*60}", Colors.CYAN))
+    print(Styled.HEADER_TOP)
     print(colorize(f"  {text}", Colors.BOLD))
-    print(colorize(f"{'='*60}\n", Colors.CYAN))
+    print(Styled.HEADER_BOTTOM)
 
 
-def print_snapshot(snapshot: Snapshot, index: int = None) -> None:
-    """Print snapshot information in a formatted way."""
+def format_snapshot(snapshot: Snapshot, index: int = None) -> List[str]:
+    """Format snapshot information as output lines."""
     prefix = f"[{index}] " if index is not None else ""
     
-    print(f"{colorize(prefix + snapshot.id, Colors.BOLD)}")
-    print(f"  {colorize('Created:', Colors.GRAY)} {snapshot.created_at}")
-    print(f"  {colorize('Task:', Colors.GRAY)} {snapshot.task_description}")
-    print(f"  {colorize('Agent:', Colors.GRAY)} {snapshot.agent}")
-    print(f"  {colorize('Mode:', Colors.GRAY)} {snapshot.mode}")
-    print(f"  {colorize('Files:', Colors.GRAY)} {len(snapshot.files_modified)} modified")
+    lines = [
+        colorize(prefix + snapshot.id, Colors.BOLD),
+        f"  {Styled.CREATED} {snapshot.created_at}",
+        f"  {Styled.TASK} {snapshot.task_description}",
+        f"  {Styled.AGENT} {snapshot.agent}",
+        f"  {Styled.MODE} {snapshot.mode}",
+        f"  {Styled.FILES} {len(snapshot.files_modified)} modified",
+    ]
     if snapshot.files_modified:
-        for f in snapshot.files_modified[:5]:
-            print(f"    - {f}")
+        lines.extend(f"    - {f}" for f in snapshot.files_modified[:5])
         if len(snapshot.files_modified) > 5:
-            print(f"    ... and {len(snapshot.files_modified) - 5} more")
-    print()
+            lines.append(f"    ... and {len(snapshot.files_modified) - 5} more")
+    lines.append("")
+    return lines
+
+
+def print_snapshot(snapshot: Snapshot, index: int = None) -> None:
+    """Print snapshot information in a formatted way."""
+    sys.stdout.write("\n".join(format_snapshot(snapshot, index)) + "\n")
 
 
 def print_diff(diff: DiffResult) -> None:
-    """Print diff information in a formatted way."""
+    """Print diff information in a formatted way (one write for all lines)."""
+    lines = []
     if diff.files_added:
-        print(colorize("Added files:", Colors.GREEN))
-        for f in diff.files_added:
-            print(f"  + {f}")
+        lines.append(colorize("Added files:", Colors.GREEN))
+        lines.extend(f"  + {f}" for f in diff.files_added)
     
     if diff.files_modified:
-        print(colorize("Modified files:", Colors.YELLOW))
-        for f in diff.files_modified:
-            print(f"  ~ {f}")
+        lines.append(colorize("Modified files:", Colors.YELLOW))
+        lines.extend(f"  ~ {f}" for f in diff.files_modified)
     
     if diff.files_deleted:
-        print(colorize("Deleted files:", Colors.RED))
-        for f in diff.files_deleted:
-            print(f"  - {f}")
+        lines.append(colorize("Deleted files:", Colors.RED))
+        lines.extend(f"  - {f}" for f in diff.files_deleted)
     
     if not (diff.files_added or diff.files_modified or diff.files_deleted):
-        print(colorize("No changes detected.", Colors.GRAY))
+        lines.append(colorize("No changes detected.", Colors.GRAY))
     
     if diff.diff_content:
-        print(colorize("\nDiff content:", Colors.CYAN))
-        print("-" * 40)
-        # Colorize diff output
-        for line in diff.diff_content.splitlines()[:50]:
-            if line.startswith("+") and not line.startswith("+++"):
-                print(colorize(line, Colors.GREEN))
-            elif line.startswith("-") and not line.startswith("---"):
-                print(colorize(line, Colors.RED))
-            elif line.startswith("@@"):
-                print(colorize(line, Colors.CYAN))
-            else:
-                print(line)
+        lines.append(colorize("\nDiff content:", Colors.CYAN))
+        lines.append("-" * 40)
+        # Colorize diff output: one anchored match classifies the prefix
+        content_lines = diff.diff_content.splitlines()
+        for line in content_lines[:50]:
+            match = DIFF_LINE_RE.match(line)
+            color = DIFF_LINE_COLORS.get(match.group()) if match else None
+            lines.append(colorize(line, color) if color else line)
         
-        lines = diff.diff_content.splitlines()
-        if len(lines) > 50:
-            print(colorize(f"\n... ({len(lines) - 50} more lines)", Colors.GRAY))
+        if len(content_lines) > 50:
+            lines.append(colorize(f"\n... ({len(content_lines) - 50} more lines)", Colors.GRAY))
+    
+    sys.stdout.write("\n".join(lines) + "\n")
+
+
+def confirm(prompt: str, assume_yes: bool = False) -> bool:
+    """Ask for confirmation; --yes and non-interactive stdin proceed without asking."""
+    if assume_yes or not sys.stdin.isatty():
+        return True
+    response = input(colorize(prompt, Colors.YELLOW))
+    return response.lower() == "y"
+
+
+@lru_cache(maxsize=None)
+def get_snapshots(manager: RollbackManager) -> List[Snapshot]:
+    """List snapshots once per manager; a CLI run reuses the same listing."""
+    return manager.list_snapshots()
 
 
 def cmd_list(manager: RollbackManager) -> int:
     """List all available snapshots."""
-    snapshots = manager.list_snapshots()
+    snapshots = get_snapshots(manager)
     
     if not snapshots:
         print(colorize("No snapshots found.", Colors.YELLOW))
@@ -119,15 +158,22 @@ def cmd_list(manager: RollbackManager) -> int:
     
     print_header(f"Available Snapshots ({len(snapshots)})")
     
+    lines = []
     for i, snapshot in enumerate(snapshots, 1):
-        print_snapshot(snapshot, i)
+        lines.extend(format_snapshot(snapshot, i))
+    sys.stdout.write("\n".join(lines) + "\n")
     
     return 0
 
 
-def cmd_latest(manager: RollbackManager, dry_run: bool = False) -> int:
+def cmd_latest(
+    manager: RollbackManager,
+    dry_run: bool = False,
+    assume_yes: bool = False
+) -> int:
     """Rollback to the latest snapshot."""
-    snapshot = manager.get_latest_snapshot()
+    snapshots = get_snapshots(manager)
+    snapshot = snapshots[0] if snapshots else None
     
     if not snapshot:
         print(colorize("No snapshots available for rollback.", Colors.RED))
@@ -141,20 +187,18 @@ def cmd_latest(manager: RollbackManager, dry_run: bool = False) -> int:
         return 0
     
     # Show diff first
-    diff = manager.diff(snapshot.id)
+    diff = manager.diff_for(snapshot, include_content=True)
     if diff:
         print(colorize("Changes that will be reverted:", Colors.CYAN))
         print_diff(diff)
         print()
     
     # Confirm rollback
-    if sys.stdin.isatty():
-        response = input(colorize("Proceed with rollback? [y/N] ", Colors.YELLOW))
-        if response.lower() != "y":
-            print(colorize("Rollback cancelled.", Colors.GRAY))
-            return 0
+    if not confirm("Proceed with rollback? [y/N] ", assume_yes):
+        print(colorize("Rollback cancelled.", Colors.GRAY))
+        return 0
     
-    if manager.rollback(snapshot.id):
+    if manager.rollback_for(snapshot):
         print(colorize(f"✅ Successfully rolled back to: {snapshot.id}", Colors.GREEN))
         return 0
     else:
@@ -166,7 +210,8 @@ def cmd_rollback_by_id(
     manager: RollbackManager,
     snapshot_id: str,
     files: Optional[List[str]] = None,
-    dry_run: bool = False
+    dry_run: bool = False,
+    assume_yes: bool = False
 ) -> int:
     """Rollback to a specific snapshot."""
     snapshot = manager.get_snapshot(snapshot_id)
@@ -174,7 +219,7 @@ def cmd_rollback_by_id(
     if not snapshot:
         print(colorize(f"Snapshot not found: {snapshot_id}", Colors.RED))
         print("\nAvailable snapshots:")
-        for s in manager.list_snapshots()[:5]:
+        for s in get_snapshots(manager)[:5]:
             print(f"  - {s.id}")
         return 1
     
@@ -192,13 +237,11 @@ def cmd_rollback_by_id(
         return 0
     
     # Confirm rollback
-    if sys.stdin.isatty():
-        response = input(colorize("Proceed with rollback? [y/N] ", Colors.YELLOW))
-        if response.lower() != "y":
-            print(colorize("Rollback cancelled.", Colors.GRAY))
-            return 0
+    if not confirm("Proceed with rollback? [y/N] ", assume_yes):
+        print(colorize("Rollback cancelled.", Colors.GRAY))
+        return 0
     
-    if manager.rollback(snapshot_id, files):
+    if manager.rollback_for(snapshot, files):
         print(colorize(f"✅ Successfully rolled back to: {snapshot_id}", Colors.GREEN))
         return 0
     else:
@@ -217,7 +260,7 @@ def cmd_diff(manager: RollbackManager, snapshot_id: str) -> int:
     print_header(f"Diff for: {snapshot_id}")
     print_snapshot(snapshot)
     
-    diff = manager.diff(snapshot_id)
+    diff = manager.diff_for(snapshot, include_content=True)
     if diff:
         print_diff(diff)
     else:
@@ -226,7 +269,7 @@ def cmd_diff(manager: RollbackManager, snapshot_id: str) -> int:
     return 0
 
 
-def cmd_delete(manager: RollbackManager, snapshot_id: str) -> int:
+def cmd_delete(manager: RollbackManager, snapshot_id: str, assume_yes: bool = False) -> int:
     """Delete a snapshot."""
     snapshot = manager.get_snapshot(snapshot_id)
     
@@ -238,11 +281,9 @@ def cmd_delete(manager: RollbackManager, snapshot_id: str) -> int:
     print_snapshot(snapshot)
     
     # Confirm deletion
-    if sys.stdin.isatty():
-        response = input(colorize("Are you sure you want to delete this snapshot? [y/N] ", Colors.YELLOW))
-        if response.lower() != "y":
-            print(colorize("Deletion cancelled.", Colors.GRAY))
-            return 0
+    if not confirm("Are you sure you want to delete this snapshot? [y/N] ", assume_yes):
+        print(colorize("Deletion cancelled.", Colors.GRAY))
+        return 0
     
     if manager.delete_snapshot(snapshot_id):
         print(colorize(f"✅ Snapshot deleted: {snapshot_id}", Colors.GREEN))
@@ -252,15 +293,16 @@ def cmd_delete(manager: RollbackManager, snapshot_id: str) -> int:
         return 1
 
 
-def cmd_cleanup(manager: RollbackManager, keep_count: int) -> int:
+def cmd_cleanup(manager: RollbackManager, keep_count: int, assume_yes: bool = False) -> int:
     """Cleanup old snapshots."""
-    snapshots = manager.list_snapshots()
+    snapshots = get_snapshots(manager)
     
     if len(snapshots) <= keep_count:
         print(colorize(f"No cleanup needed. {len(snapshots)} snapshots (keeping {keep_count}).", Colors.GREEN))
         return 0
     
-    to_delete = len(snapshots) - keep_count
+    old_snapshots = snapshots[keep_count:]
+    to_delete = len(old_snapshots)
     print_header(f"Cleanup: Removing {to_delete} Old Snapshots")
     
     print(f"Current snapshots: {len(snapshots)}")
@@ -269,24 +311,29 @@ def cmd_cleanup(manager: RollbackManager, keep_count: int) -> int:
     print()
     
     print("Snapshots to be deleted:")
-    for snapshot in snapshots[keep_count:]:
+    for snapshot in old_snapshots:
         print(f"  - {snapshot.id} ({snapshot.task_description})")
     print()
     
     # Confirm cleanup
-    if sys.stdin.isatty():
-        response = input(colorize(f"Delete {to_delete} snapshots? [y/N] ", Colors.YELLOW))
-        if response.lower() != "y":
-            print(colorize("Cleanup cancelled.", Colors.GRAY))
-            return 0
+    if not confirm(f"Delete {to_delete} snapshots? [y/N] ", assume_yes):
+        print(colorize("Cleanup cancelled.", Colors.GRAY))
+        return 0
     
-    deleted = manager.cleanup_old_snapshots(keep_count)
+    # Same as cleanup_old_snapshots(), without listing the snapshots again
+    deleted = manager.delete_batch([snapshot.id for snapshot in old_snapshots])
     print(colorize(f"✅ Deleted {deleted} snapshots.", Colors.GREEN))
     return 0
 
 
 def main() -> int:
     """Main entry point."""
+    # Fast path for the default/--list command: no argument parser needed
+    if sys.argv[1:] in ([], ["--list"], ["-l"]):
+        return cmd_list(RollbackManager())
+    
+    import argparse
+    
     parser = argparse.ArgumentParser(
         description="Manage AI task snapshots and rollbacks",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -367,25 +414,19 @@ Examples:
     project_root = Path(args.project_root) if args.project_root else None
     manager = RollbackManager(project_root)
     
-    # Handle --yes flag by making stdin non-interactive
-    if args.yes:
-        # Redirect stdin to prevent prompts
-        import io
-        sys.stdin = io.StringIO("y\n")
-    
     # Execute command
     if args.list:
         return cmd_list(manager)
     elif args.latest:
-        return cmd_latest(manager, args.dry_run)
+        return cmd_latest(manager, args.dry_run, args.yes)
     elif args.id:
-        return cmd_rollback_by_id(manager, args.id, args.files, args.dry_run)
+        return cmd_rollback_by_id(manager, args.id, args.files, args.dry_run, args.yes)
     elif args.diff:
         return cmd_diff(manager, args.diff)
     elif args.delete:
-        return cmd_delete(manager, args.delete)
+        return cmd_delete(manager, args.delete, args.yes)
     elif args.cleanup is not None:
-        return cmd_cleanup(manager, args.cleanup)
+        return cmd_cleanup(manager, args.cleanup, args.yes)
     else:
         # Default: list snapshots
         return cmd_list(manager)
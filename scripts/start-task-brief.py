@@ -2,75 +2,131 @@
 from __future__ import annotations
 
 import argparse
+import functools
+import importlib.util
+import os
 import subprocess
+import sys
 from datetime import datetime, timezone
 from pathlib import Path
 
-ROOT = Path(__file__).resolve().parents[1]
+# abspath() skips the per-component readlink() of resolve(); symlinks don't matter here
+ROOT = Path(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 LATEST = ROOT / "docs" / "task-briefs" / "latest.md"
 TEMPLATE = ROOT / "examples" / "prompts" / "task-brief.md"
-
-
-def run_git(args: list[str]) -> str:
-    result = subprocess.run(
-        ["git", *args],
-        cwd=ROOT,
-        capture_output=True,
-        text=True,
-        check=False,
-    )
-    if result.returncode != 0:
-        return ""
-    return result.stdout.strip()
-
-
+HEADER_TEMPLATE = (
+    "# Task Brief (Latest)\n"
+    "\n"
+    "## Meta\n"
+    "- UpdatedAt: {updated_at}\n"
+    "- Branch: {branch}\n"
+    "- Title: {title}\n"
+)
+
+
+def _read_git_head() -> str:
+    # Same lookup git does: HEAD of the nearest enclosing repository
+    for base in (ROOT, *ROOT.parents):
+        git_path = base / ".git"
+        try:
+            return (git_path / "HEAD").read_text(encoding="utf-8").strip()
+        except FileNotFoundError:
+            continue
+        except NotADirectoryError:
+            pass
+        except OSError:
+            return ""
+        # Worktrees and submodules have a .git file pointing at the real git dir
+        try:
+            pointer = git_path.read_text(encoding="utf-8").strip()
+            if not pointer.startswith("gitdir:"):
+                return ""
+            git_dir = base / pointer[len("gitdir:"):].strip()
+            return (git_dir / "HEAD").read_text(encoding="utf-8").strip()
+        except OSError:
+            return ""
+    return ""
+
+
+@functools.lru_cache(maxsize=None)
 def current_branch() -> str:
-    return run_git(["rev-parse", "--abbrev-ref", "HEAD"]) or "unknown"
+    # Matches `git rev-parse --abbrev-ref HEAD` without spawning git
+    head = _read_git_head()
+    if head.startswith("ref: "):
+        return head[len("ref: "):].removeprefix("refs/heads/")
+    # A detached HEAD holds a commit id, which git reports as "HEAD"
+    return "HEAD" if head else "unknown"
 
 
+@functools.lru_cache(maxsize=1)
 def utc_now() -> str:
-    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    # One timestamp per run; isoformat() skips strftime's format parsing
+    return datetime.now(timezone.utc).isoformat(timespec="seconds").replace("+00:00", "Z")
 
 
 def load_template(path: Path) -> str:
     content = path.read_text(encoding="utf-8")
     lines = content.splitlines()
+    # Skip the title and following blank lines by index instead of re-slicing
+    start = 0
     if lines and lines[0].startswith("# "):
-        lines = lines[1:]
-        while lines and not lines[0].strip():
-            lines = lines[1:]
-    return "\n".join(lines).rstrip() + "\n"
+        start = 1
+        while start < len(lines) and not lines[start].strip():
+            start += 1
+    return "\n".join(lines[start:]).rstrip() + "\n"
 
 
 def archive_current(by_branch: bool, by_title: bool) -> None:
     archive_script = ROOT / "scripts" / "archive-task-brief.py"
-    args = ["python3", str(archive_script)]
-    if by_branch:
-        args.append("--by-branch")
-    if by_title:
-        args.append("--by-title")
-    subprocess.run(
-        args,
-        cwd=ROOT,
-        check=False,
-    )
+    if not by_branch and not by_title:
+        # No layout flags keeps archive-task-brief.py's default branch/title layout
+        by_branch = by_title = True
+    try:
+        spec = importlib.util.spec_from_file_location("archive_task_brief", archive_script)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    except (ImportError, OSError, AttributeError):
+        args = [sys.executable, str(archive_script)]
+        if not by_branch:
+            args.append("--no-branch")
+        if not by_title:
+            args.append("--no-title")
+        subprocess.run(args, cwd=ROOT, check=False)
+        return
+    try:
+        archived = module.archive_latest(by_branch, by_title)
+    except (OSError, ValueError) as exc:
+        print(exc)
+        return
+    if archived is None:
+        print("Task brief already archived.")
+    else:
+        print(f"Archived task brief to {archived}")
+
+
+def open_latest(force: bool) -> int:
+    # O_EXCL makes the existence check part of the open (no stat, no race)
+    flags = os.O_WRONLY | os.O_CREAT | (os.O_TRUNC if force else os.O_EXCL)
+    try:
+        return os.open(LATEST, flags, 0o644)
+    except FileNotFoundError:
+        # The directory is only created when the open reports it missing
+        LATEST.parent.mkdir(parents=True, exist_ok=True)
+        return os.open(LATEST, flags, 0o644)
 
 
 def write_latest(title: str, template: str, force: bool) -> None:
-    if LATEST.exists() and not force:
-        raise FileExistsError("latest.md exists. Use --force to overwrite.")
-    header = "\n".join(
-        [
-            "# Task Brief (Latest)",
-            "",
-            "## Meta",
-            f"- UpdatedAt: {utc_now()}",
-            f"- Branch: {current_branch()}",
-            f"- Title: {title}",
-            "",
-        ]
+    header = HEADER_TEMPLATE.format_map(
+        {"updated_at": utc_now(), "branch": current_branch(), "title": title}
     )
-    LATEST.write_text(header + template, encoding="utf-8")
+    try:
+        fd = open_latest(force)
+    except FileExistsError:
+        raise FileExistsError("latest.md exists. Use --force to overwrite.") from None
+    # Two writes into the file buffer instead of concatenating header + template
+    with os.fdopen(fd, "w", encoding="utf-8") as fh:
+        fh.write(header)
+        fh.write(template)
 
 
 def main() -> int:
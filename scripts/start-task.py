@@ -17,19 +17,37 @@ Usage:
 from __future__ import annotations
 
 import argparse
+import functools
+import importlib.util
+import os
 import subprocess
 import sys
 from datetime import datetime, timezone
+from itertools import islice
 from pathlib import Path
-from typing import Optional, List
+from types import ModuleType
 
-# Add script directory to path
-SCRIPT_DIR = Path(__file__).resolve().parent
-sys.path.insert(0, str(SCRIPT_DIR))
+# abspath() avoids resolve()'s readlink() per path component at every startup
+SCRIPT_DIR = Path(os.path.dirname(os.path.abspath(__file__)))
 
-from core.rollback_manager import RollbackManager
-from core.agent_registry import AgentRegistry
-from core.env_detector import EnvDetector
+
+def load_core_module(name: str) -> ModuleType:
+    """
+    Load scripts/core/<name>.py by file path, once per process.
+    
+    Modules are loaded where used, so --help and arg errors skip them. Loading
+    by path keeps SCRIPT_DIR off sys.path (no extra lookup for every later
+    import) and skips core/__init__.py, which would import every core module.
+    """
+    module_name = f"core.{name}"
+    module = sys.modules.get(module_name)
+    if module is not None:
+        return module
+    spec = importlib.util.spec_from_file_location(module_name, SCRIPT_DIR / "core" / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
 
 
 class Colors:
@@ -44,48 +62,162 @@ class Colors:
     GRAY = "\033[90m"
 
 
+# isatty() is a syscall; resolve it once per run
+USE_COLOR = sys.stdout.isatty()
+
+
 def colorize(text: str, color: str) -> str:
     """Apply color if terminal supports it."""
-    if sys.stdout.isatty():
+    if USE_COLOR:
         return f"{color}{text}{Colors.RESET}"
     return text
 
 
+class Styled:
+    """Colored strings that never change, formatted once at import."""
+    BANNER_TOP = colorize("\n" + "═" * 60, Colors.CYAN)
+    BANNER_TITLE = colorize("  Task Started Successfully", Colors.BOLD + Colors.GREEN)
+    BANNER_BOTTOM = colorize("═" * 60, Colors.CYAN)
+    SECTION_TOP = colorize("\n" + "─" * 60, Colors.GRAY)
+    SECTION_BOTTOM = colorize("─" * 60, Colors.GRAY)
+    TASK = colorize("Task:", Colors.CYAN)
+    TYPE = colorize("Type:", Colors.CYAN)
+    AGENT = colorize("Agent:", Colors.CYAN)
+    SNAPSHOT = colorize("Snapshot:", Colors.CYAN)
+    FILES = colorize("Files:", Colors.CYAN)
+    TASK_BRIEF = colorize("Task Brief:", Colors.CYAN)
+
+
+# Only the brief path, agent and root are filled in per call
+NEXT_STEPS_TEMPLATE = f"""
+{colorize('Next Steps:', Colors.BOLD)}
+
+{colorize('1.', Colors.CYAN)} Edit the task brief if needed:
+   {{brief}}
+
+{colorize('2.', Colors.CYAN)} Start working with your AI agent:
+   {{agent}}
+
+{colorize('3.', Colors.CYAN)} When done, finish the task:
+   python3 {{root}}/scripts/finish-task.py
+
+{colorize('4.', Colors.CYAN)} If you need to rollback:
+   python3 {{root}}/scripts/rollback.py --latest
+   # or view all snapshots:
+   python3 {{root}}/scripts/rollback.py --list
+
+"""
+
+
 # Root and paths
 ROOT = SCRIPT_DIR.parent
 LATEST_BRIEF = ROOT / "docs" / "task-briefs" / "latest.md"
 TEMPLATE = ROOT / "examples" / "prompts" / "task-brief.md"
 
+EPILOG = """
+Examples:
+  %(prog)s "Implement user login feature"
+  %(prog)s "Fix authentication bug" --type fix
+  %(prog)s "Refactor database layer" --agent aider
+  %(prog)s "Add unit tests" --files src/auth.py src/utils.py
+"""
+
+# The brief is written as head (formatted), one line per file, then the constant tail
+BRIEF_HEAD_TEMPLATE = """# Task Brief (Latest)
 
-def run_git(args: List[str]) -> str:
-    """Run a git command and return output."""
-    result = subprocess.run(
-        ["git", *args],
-        cwd=ROOT,
-        capture_output=True,
-        text=True,
-        check=False,
-    )
-    return result.stdout.strip() if result.returncode == 0 else ""
+## Meta
+- UpdatedAt: {updated_at}
+- Branch: {branch}
+- Title: {title}
+- Type: {task_type}
+- Agent: {agent}
+
+## Description
+{description}
+
+## Scope
+### In-scope
+- {title}
+
+### Out-of-scope
+- (Define what's not included)
 
+## Files
+"""
+BRIEF_TAIL = """
+## Acceptance Criteria
+- [ ] Task completed as described
+- [ ] Tests pass
+- [ ] Documentation updated (if needed)
 
+## Notes
+- Created by start-task.py
+- Snapshot created for rollback capability
+"""
+# Without files (the common case) the whole brief is one template and one write
+BRIEF_NO_FILES_TEMPLATE = BRIEF_HEAD_TEMPLATE + "- (To be determined)\n" + BRIEF_TAIL
+
+
+def _read_git_head() -> str:
+    """Read HEAD of the nearest enclosing repository ("" if there is none)."""
+    for base in (ROOT, *ROOT.parents):
+        git_path = base / ".git"
+        try:
+            return (git_path / "HEAD").read_text(encoding="utf-8").strip()
+        except FileNotFoundError:
+            continue
+        except NotADirectoryError:
+            pass
+        except OSError:
+            return ""
+        # Worktrees and submodules have a .git file pointing at the real git dir
+        try:
+            pointer = git_path.read_text(encoding="utf-8").strip()
+            if not pointer.startswith("gitdir:"):
+                return ""
+            git_dir = base / pointer[len("gitdir:"):].strip()
+            return (git_dir / "HEAD").read_text(encoding="utf-8").strip()
+        except OSError:
+            return ""
+    return ""
+
+
+@functools.lru_cache(maxsize=None)
 def current_branch() -> str:
-    """Get current git branch."""
-    return run_git(["rev-parse", "--abbrev-ref", "HEAD"]) or "unknown"
+    """Get current git branch, as `git rev-parse --abbrev-ref HEAD` reports it."""
+    head = _read_git_head()
+    if head.startswith("ref: "):
+        return head[len("ref: "):].removeprefix("refs/heads/")
+    # A detached HEAD holds a commit id, which git reports as "HEAD"
+    return "HEAD" if head else "unknown"
 
 
-def utc_now() -> str:
-    """Get current UTC time as ISO string."""
-    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+def utc_now(now: datetime | None = None) -> str:
+    """Format a UTC time (default: current time) as ISO string."""
+    now = now or datetime.now(timezone.utc)
+    return now.isoformat(timespec="seconds").replace("+00:00", "Z")
+
+
+def open_brief(force: bool) -> int:
+    """Open the task brief for writing; without force, fail if it already exists."""
+    # O_EXCL makes the existence check part of the open (no stat, no race)
+    flags = os.O_WRONLY | os.O_CREAT | (os.O_TRUNC if force else os.O_EXCL)
+    try:
+        return os.open(LATEST_BRIEF, flags, 0o644)
+    except FileNotFoundError:
+        # Only a fresh checkout is missing the brief directory
+        LATEST_BRIEF.parent.mkdir(parents=True, exist_ok=True)
+        return os.open(LATEST_BRIEF, flags, 0o644)
 
 
 def create_task_brief(
     title: str,
     description: str,
     task_type: str,
-    agent: Optional[str] = None,
-    files: Optional[List[str]] = None,
-    force: bool = False
+    agent: str | None = None,
+    files: list[str] | None = None,
+    force: bool = False,
+    now: datetime | None = None
 ) -> bool:
     """
     Create or update the task brief.
@@ -97,52 +229,37 @@ def create_task_brief(
         agent: AI agent being used
         files: Files involved in the task
         force: Overwrite existing brief
+        now: Start time of the task (default: current time)
     
     Returns:
         True if successful
     """
-    if LATEST_BRIEF.exists() and not force:
+    template = BRIEF_HEAD_TEMPLATE if files else BRIEF_NO_FILES_TEMPLATE
+    text = template.format(
+        updated_at=utc_now(now),
+        branch=current_branch(),
+        title=title,
+        task_type=task_type,
+        agent=agent or "auto",
+        description=description,
+    )
+    
+    try:
+        fd = open_brief(force)
+    except FileExistsError:
         print(colorize(f"⚠️  Task brief already exists: {LATEST_BRIEF}", Colors.YELLOW))
         print("Use --force to overwrite, or archive first with:")
         print(f"  python3 {ROOT}/scripts/archive-task-brief.py")
         return False
     
-    # Ensure directory exists
-    LATEST_BRIEF.parent.mkdir(parents=True, exist_ok=True)
-    
-    content = f"""# Task Brief (Latest)
-
-## Meta
-- UpdatedAt: {utc_now()}
-- Branch: {current_branch()}
-- Title: {title}
-- Type: {task_type}
-- Agent: {agent or 'auto'}
-
-## Description
-{description}
-
-## Scope
-### In-scope
-- {title}
-
-### Out-of-scope
-- (Define what's not included)
-
-## Files
-{chr(10).join(f'- {f}' for f in (files or [])) or '- (To be determined)'}
-
-## Acceptance Criteria
-- [ ] Task completed as described
-- [ ] Tests pass
-- [ ] Documentation updated (if needed)
-
-## Notes
-- Created by start-task.py
-- Snapshot created for rollback capability
-"""
-    
-    LATEST_BRIEF.write_text(content, encoding="utf-8")
+    with os.fdopen(fd, "w", encoding="utf-8") as fh:
+        fh.write(text)
+        if files:
+            for path in files:
+                fh.write("- ")
+                fh.write(path)
+                fh.write("\n")
+            fh.write(BRIEF_TAIL)
     return True
 
 
@@ -150,67 +267,55 @@ def print_summary(
     task_id: str,
     title: str,
     task_type: str,
-    agent: Optional[str],
-    snapshot_id: Optional[str],
-    files: Optional[List[str]]
+    agent: str | None,
+    snapshot_id: str | None,
+    files: list[str] | None
 ) -> None:
     """Print task summary."""
-    print(colorize("\n" + "═" * 60, Colors.CYAN))
-    print(colorize("  Task Started Successfully", Colors.BOLD + Colors.GREEN))
-    print(colorize("═" * 60, Colors.CYAN))
-    
-    print(f"\n{colorize('Task:', Colors.CYAN)} {title}")
-    print(f"{colorize('Type:', Colors.CYAN)} {task_type}")
-    print(f"{colorize('Agent:', Colors.CYAN)} {agent or 'auto-selected'}")
+    lines = [
+        Styled.BANNER_TOP,
+        Styled.BANNER_TITLE,
+        Styled.BANNER_BOTTOM,
+        f"\n{Styled.TASK} {title}",
+        f"{Styled.TYPE} {task_type}",
+        f"{Styled.AGENT} {agent or 'auto-selected'}",
+    ]
     
     if snapshot_id:
-        print(f"{colorize('Snapshot:', Colors.CYAN)} {snapshot_id}")
+        lines.append(f"{Styled.SNAPSHOT} {snapshot_id}")
     
     if files:
-        print(f"{colorize('Files:', Colors.CYAN)}")
-        for f in files[:5]:
-            print(f"  - {f}")
-        if len(files) > 5:
-            print(f"  ... and {len(files) - 5} more")
+        lines.append(Styled.FILES)
+        shown = 0
+        for f in islice(files, 5):
+            lines.append(f"  - {f}")
+            shown += 1
+        remaining = len(files) - shown
+        if remaining > 0:
+            lines.append(f"  ... and {remaining} more")
     
-    print(colorize("\n" + "─" * 60, Colors.GRAY))
-    print(f"{colorize('Task Brief:', Colors.CYAN)} {LATEST_BRIEF}")
-    print(colorize("─" * 60, Colors.GRAY))
+    lines.append(Styled.SECTION_TOP)
+    lines.append(f"{Styled.TASK_BRIEF} {LATEST_BRIEF}")
+    lines.append(Styled.SECTION_BOTTOM)
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
-def print_next_steps(agent: Optional[str], task_id: str) -> None:
+def print_next_steps(agent: str | None, task_id: str) -> None:
     """Print next steps."""
-    print(f"""
-{colorize('Next Steps:', Colors.BOLD)}
-
-{colorize('1.', Colors.CYAN)} Edit the task brief if needed:
-   {LATEST_BRIEF}
-
-{colorize('2.', Colors.CYAN)} Start working with your AI agent:
-   {f'{agent}' if agent else 'Use your preferred AI tool'}
+    sys.stdout.write(NEXT_STEPS_TEMPLATE.format(
+        brief=LATEST_BRIEF,
+        agent=agent or "Use your preferred AI tool",
+        root=ROOT,
+    ))
 
-{colorize('3.', Colors.CYAN)} When done, finish the task:
-   python3 {ROOT}/scripts/finish-task.py
 
-{colorize('4.', Colors.CYAN)} If you need to rollback:
-   python3 {ROOT}/scripts/rollback.py --latest
-   # or view all snapshots:
-   python3 {ROOT}/scripts/rollback.py --list
-""")
-
-
-def main() -> int:
-    """Main entry point."""
+@functools.lru_cache(maxsize=None)
+def build_parser() -> argparse.ArgumentParser:
+    """Build the command-line parser (once per process)."""
     parser = argparse.ArgumentParser(
         description="Start a new AI-assisted development task",
         formatter_class=argparse.RawDescriptionHelpFormatter,
-        epilog="""
-Examples:
-  %(prog)s "Implement user login feature"
-  %(prog)s "Fix authentication bug" --type fix
-  %(prog)s "Refactor database layer" --agent aider
-  %(prog)s "Add unit tests" --files src/auth.py src/utils.py
-        """
+        epilog=EPILOG
     )
     
     parser.add_argument(
@@ -266,7 +371,12 @@ Examples:
         action="store_true",
         help="Minimal output"
     )
-    
+    return parser
+
+
+def main() -> int:
+    """Main entry point."""
+    parser = build_parser()
     args = parser.parse_args()
     
     # Validate input
@@ -300,14 +410,18 @@ Examples:
     if not args.quiet:
         print(colorize("\n🚀 Starting new task...\n", Colors.BOLD))
     
+    # One clock read shared by the task id and the brief timestamp
+    now = datetime.now(timezone.utc)
+    
     # Create snapshot (unless disabled)
     snapshot_id = None
     if not args.no_snapshot:
         if not args.quiet:
             print(colorize("Creating snapshot for rollback...", Colors.GRAY))
         
+        RollbackManager = load_core_module("rollback_manager").RollbackManager
         manager = RollbackManager(project_root)
-        task_id = f"task_{args.type}_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}"
+        task_id = f"task_{args.type}_{now.strftime('%Y%m%d_%H%M%S')}"
         
         snapshot = manager.create_snapshot(
             task_id=task_id,
@@ -329,16 +443,20 @@ Examples:
         task_type=args.type,
         agent=args.agent,
         files=args.files,
-        force=args.force
+        force=args.force,
+        now=now
     ):
         return 1
     
     if not args.quiet:
         print(colorize(f"  ✅ Task brief created: {LATEST_BRIEF}", Colors.GREEN))
     
-    # Determine agent
+    # Determine agent (only a launch needs a recommendation; the summary
+    # otherwise shows "auto-selected" without probing installed agents)
     selected_agent = args.agent
-    if not selected_agent:
+    registry = None
+    if args.launch and not selected_agent:
+        AgentRegistry = load_core_module("agent_registry").AgentRegistry
         registry = AgentRegistry(project_root)
         recommended = registry.get_recommended_agent()
         if recommended:
@@ -361,8 +479,10 @@ Examples:
         if not args.quiet:
             print(colorize(f"\n🤖 Launching {selected_agent}...", Colors.CYAN))
         
-        # Get adapter and launch
-        registry = AgentRegistry(project_root)
+        # Get adapter and launch (reusing the registry from agent selection)
+        if registry is None:
+            AgentRegistry = load_core_module("agent_registry").AgentRegistry
+            registry = AgentRegistry(project_root)
         adapter = registry.get_adapter(selected_agent.replace("-", "_"))
         
         if adapter and hasattr(adapter, 'chat'):